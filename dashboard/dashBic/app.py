@@ -1,18 +1,46 @@
+from .helpers.startup import startup
+
+import os
+
 import dash
 from dash import html, dcc, Input, Output
 import dash_bootstrap_components as dbc
+from flask import Response, jsonify, request
 
-from .data.loadData import load_and_prepare_data
+from .data.memoryReport import MEMORY_REPORT_ENDPOINT, format_report, memory_report
+from .data.store import store, build_dataset
+from .data.refresher import DataRefresher
+from .helpers.cache import CallbackCache, RenderCache
+from .helpers.tabs import TABS
+from .helpers.figures import GRID_TABS
+from .helpers.responses import compress_responses, use_fast_json
 from .layout.overview import render_overview, register_overview_callbacks
 from .layout.trends import render_trends
 from .layout.violationCategories import render_violation_categories
 from .layout.fineViolationRelationships import render_fine_violation_tab
-from .layout.frequentViolators import render_frequent_violators_tab
+from .layout.frequentViolators import render_frequent_violators_tab, register_frequent_violators_callbacks
 from .layout.takeaways import render_key_takeaways_tab
+from ..shared.callbackMetrics import CallbackMetrics
+
+startup.mark("imports")
 
 
 # Prepare data
-complaints_df, violations_df = load_and_prepare_data()
+store.publish(build_dataset())
+startup.mark("data load")
+
+# Reload in the background every BIC_REFRESH_INTERVAL seconds (off by default)
+refresher = DataRefresher(store)
+refresher.start()
+
+# Rendered tabs this worker has served, checked before the shared cache
+# below; dropped whenever new data is published
+render_cache = RenderCache()
+store.subscribe(lambda dataset: render_cache.clear())
+
+# Tab and slider results shared across gunicorn workers; tabs only reach it
+# when the render cache above misses
+callback_cache = CallbackCache()
 
 # --- Dash App Setup ---
 app = dash.Dash(
@@ -24,39 +52,70 @@ app = dash.Dash(
 app.title = "NYC BIC Compliance Dashboard"
 server = app.server  # 👈 Render uses this for deployment
 
+# orjson for callback JSON; brotli/gzip for responses above the size threshold
+use_fast_json()
+compress_responses(server)
+
+# Per-callback latency, size and exception metrics on /metrics, summed over
+# the host's workers in BIC_METRICS_PATH
+callback_metrics = CallbackMetrics(
+    server, app.callback_map, label_inputs={"tab": ("tabs", TABS)}, store=os.environ.get("BIC_METRICS_PATH"),
+)
+
+startup.mark("dash app")
+
 # App layout
 app.layout = dbc.Container([
     dbc.NavbarSimple(
         brand="NYC BIC Compliance Dashboard", color="primary", dark=True, fluid=True, className="mb-4"
     ),
     dbc.Tabs([
-        dbc.Tab(label="Overview & Summary", tab_id="overview"),
-        dbc.Tab(label="Long Term Trends", tab_id="trends"),
-        dbc.Tab(label="Violation Categories", tab_id="violations"),
-        dbc.Tab(label="Fine-Violation Relationships", tab_id="fine-violation relationships"),
-        dbc.Tab(label="Frequent Violators", tab_id="frequent violators"),
-        dbc.Tab(label="Key Takeaways", tab_id="takeaways"),
+        dbc.Tab(label=label, tab_id=tab) for tab, label in TABS.items()
     ], id="tabs", active_tab="overview", className="mb-4"),
     html.Div(id="tab-content")
 ], fluid=True)
+startup.mark("layout")
 
 @app.callback(Output("tab-content", "children"), Input("tabs", "active_tab"))
-def render_tab_content(tab):
+@callback_cache.cached(store.get, local=render_cache)
+def render_tab_content(tab, data):
+    return render_tab(tab, data)
+
+def render_tab(tab, data):
     if tab == "overview":
-        return render_overview(violations_df)
+        return render_overview()
     elif tab == "trends":
-        return render_trends(complaints_df, violations_df)
+        return render_trends(data.trends)
     elif tab == "violations":
-        return render_violation_categories(violations_df)
+        return render_violation_categories(data.cube, data.fine_counts)
     elif tab == "fine-violation relationships":
-        return render_fine_violation_tab(violations_df)
+        return render_fine_violation_tab(data.cube, grid=tab in GRID_TABS)
     elif tab == "frequent violators":
-        return render_frequent_violators_tab(violations_df)
+        return render_frequent_violators_tab(data.rankings, grid=tab in GRID_TABS)
     elif tab == "takeaways":
         return render_key_takeaways_tab()
 
 # Register modular callbacks
-register_overview_callbacks(app, violations_df)
+register_overview_callbacks(app, store, callback_cache)
+register_frequent_violators_callbacks(app)
+
+# Deep memory per frame and column and the cache sizes; ?format=json for
+# the raw numbers. Tab allocations are only measured by the CLI
+# (tools/memoryReport.py): tracemalloc would count every other request
+# this worker is serving at the same time.
+if MEMORY_REPORT_ENDPOINT:
+    @server.route("/memory")
+    def memory():
+        if request.args.get("tabs") == "1":
+            return Response("Tab allocations are only measured by python -m dashboard.dashBic.tools.memoryReport\n",
+                            status=400, mimetype="text/plain")
+        report = memory_report(store.get(), caches={"render": render_cache, "callbacks": callback_cache})
+        if request.args.get("format") == "json":
+            return jsonify(report)
+        return Response(format_report(report), mimetype="text/plain")
+
+startup.mark("callbacks")
+startup.report()
 
 if __name__ == "__main__":
    #app.run(debug=True)
@@ -0,0 +1,63 @@
+// Frequent Violators toggles: swap precomputed columns into the figures the
+// server already rendered, so only data and titles change in the browser
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    bic: Object.assign({}, (window.dash_clientside || {}).bic, {
+        switchFrequentViolators: function (rankBy, fineMetric, payload, mainFigure, seriesFigures) {
+            const rank = payload.ranks[rankBy];
+            const fineTitle = payload.fine_titles[fineMetric];
+
+            const main = structuredClone(mainFigure);
+            main.data[0].x = rank.accounts;
+            main.data[0].y = rank.TotalFines;
+            main.data[1].x = rank.accounts;
+            main.data[1].y = rank.ViolationCount;
+
+            function setFineTitle(layout) {
+                // Only the secondary axes that were drawn with a title carry one
+                Object.keys(layout).forEach(function (key) {
+                    const axis = layout[key];
+                    if (key.startsWith("yaxis") && axis.overlaying && axis.title) {
+                        axis.title = Object.assign({}, axis.title, {text: fineTitle});
+                    }
+                });
+            }
+
+            function setPanel(figure, barIndex, account) {
+                // Panels beyond this ranking's accounts (short rankings) are blanked
+                const series = account === undefined ? null : payload.series[account];
+                figure.data[barIndex].x = series ? series.Year : [];
+                figure.data[barIndex].y = series ? series.ViolationCount : [];
+                figure.data[barIndex + 1].x = series ? series.Year : [];
+                figure.data[barIndex + 1].y = series ? series[fineMetric] : [];
+                figure.data[barIndex + 1].name = fineMetric;
+            }
+
+            let figures;
+            if (payload.grid) {
+                const grid = structuredClone(seriesFigures[0]);
+                const annotations = grid.layout.annotations || [];
+                const panels = Math.min(Math.floor(grid.data.length / 2), annotations.length);
+                for (let i = 0; i < panels; i++) {
+                    const account = i < rank.accounts.length ? rank.accounts[i] : undefined;
+                    setPanel(grid, 2 * i, account);
+                    annotations[i].text = account === undefined ? "" : account;
+                }
+                setFineTitle(grid.layout);
+                figures = [grid];
+            } else {
+                figures = seriesFigures.map(function (seriesFigure, i) {
+                    const figure = structuredClone(seriesFigure);
+                    const account = i < rank.accounts.length ? rank.accounts[i] : undefined;
+                    setPanel(figure, 0, account);
+                    figure.layout.title = Object.assign({}, figure.layout.title, {
+                        text: account === undefined ? "" : account
+                    });
+                    setFineTitle(figure.layout);
+                    return figure;
+                });
+            }
+
+            return rank.cards.concat([main, figures]);
+        }
+    })
+});
@@ -1,14 +1,15 @@
 import dash_bootstrap_components as dbc
 from dash import html
 
-def generate_metric_cards(df):
-    total_violations = len(df)
-    total_fines = df["FINE AMOUNT"].sum()
-    avg_fine = df["FINE AMOUNT"].mean()
-    median_fine = df["FINE AMOUNT"].median()
-    max_fine = df["FINE AMOUNT"].max()
-    min_fine = df[df["FINE AMOUNT"] > 0]["FINE AMOUNT"].min()
-    total_accounts = df["ACCOUNT NAME"].nunique()
+def generate_metric_cards(summary):
+    # summary is a year range answered by data.summary.summarize
+    total_violations = summary["total_violations"]
+    total_fines = summary["total_fines"]
+    avg_fine = summary["avg_fine"]
+    median_fine = summary["median_fine"]
+    max_fine = summary["max_fine"]
+    min_fine = summary["min_fine"]
+    total_accounts = summary["total_accounts"]
     avg_violations_per_account = total_violations / total_accounts if total_accounts else 0
     avg_fines_per_account = total_fines / total_accounts if total_accounts else 0
 
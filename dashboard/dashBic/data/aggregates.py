@@ -0,0 +1,164 @@
+import numpy as np
+import pandas as pd
+
+from .cube import build_cube, merge_cubes, update_cube
+from .schema import concat_frames
+
+# Everything the tabs read is one of these; each can be built from any slice
+# of the violations and folded together, so the rows never have to be held at once
+AGGREGATES = ('cube', 'fine_counts', 'first_seen')
+
+# Fines take only a handful of distinct amounts, so counting each amount per
+# (Year, ShortLabel) keeps exact medians and distributions in a few thousand rows
+FINE_KEYS = ['Year', 'ShortLabel', 'FINE AMOUNT']
+RULE_KEY = 'DESCRIPTION OF RULE'
+# Partial aggregates merged at a time while folding a stream of chunks
+FOLD_BATCH = 4
+
+
+def build_fine_counts(violations):
+    counts = (
+        violations
+        .groupby(FINE_KEYS, observed=True, dropna=False)
+        .size()
+        .rename('Rows')
+        .reset_index()
+    )
+    counts['Year'] = counts['Year'].astype('int16')
+    return counts
+
+
+def merge_fine_counts(parts):
+    merged = (
+        concat_frames(parts)
+        .groupby(FINE_KEYS, observed=True, dropna=False)['Rows']
+        .sum()
+        .reset_index()
+    )
+    merged['Year'] = merged['Year'].astype('int16')
+    return merged[merged['Rows'] > 0].reset_index(drop=True)
+
+
+def build_first_seen(violations):
+    return (
+        violations.dropna(subset=[RULE_KEY, 'DATE VIOLATION ISSUED'])
+        .groupby(RULE_KEY, observed=True)['DATE VIOLATION ISSUED']
+        .min()
+        .rename('FirstSeen')
+        .reset_index()
+    )
+
+
+def merge_first_seen(parts):
+    return (
+        concat_frames(parts)
+        .groupby(RULE_KEY, observed=True)['FirstSeen']
+        .min()
+        .reset_index()
+    )
+
+
+def build_aggregates(violations):
+    return {
+        'cube': build_cube(violations),
+        'fine_counts': build_fine_counts(violations),
+        'first_seen': build_first_seen(violations),
+    }
+
+
+def fold_aggregates(parts):
+    # Merges any number of partial aggregates with one groupby each
+    parts = list(parts)
+    if len(parts) == 1:
+        return parts[0]
+    return {
+        'cube': merge_cubes([part['cube'] for part in parts]),
+        'fine_counts': merge_fine_counts([part['fine_counts'] for part in parts]),
+        'first_seen': merge_first_seen([part['first_seen'] for part in parts]),
+    }
+
+
+def push_aggregates(levels, part):
+    # Folds chunk aggregates as they arrive: FOLD_BATCH parts on one level
+    # merge into a single part on the next, so each row is regrouped about
+    # log(chunks) times rather than once for every later chunk, and only a
+    # few parts per level are held at once
+    level = 0
+    while True:
+        if level == len(levels):
+            levels.append([])
+        levels[level].append(part)
+        if len(levels[level]) < FOLD_BATCH:
+            return
+        part = fold_aggregates(levels[level])
+        levels[level] = []
+        level += 1
+
+
+def finish_aggregates(levels):
+    return fold_aggregates(part for level in levels for part in level)
+
+
+def update_aggregates(current, removed, added, violations):
+    # Counts can be taken back out; a first-seen date can't, so rules that
+    # lost rows are rebuilt from the merged violations like cube cells are
+    removed_counts = build_fine_counts(removed).assign(Rows=lambda df: -df['Rows'])
+    first_seen = current['first_seen']
+    if len(removed):
+        touched = first_seen[RULE_KEY].isin(removed[RULE_KEY])
+        rebuilt = build_first_seen(violations[violations[RULE_KEY].isin(removed[RULE_KEY]).to_numpy()])
+        first_seen = merge_first_seen([first_seen[~touched], rebuilt])
+
+    return {
+        'cube': update_cube(current['cube'], removed, added, violations),
+        'fine_counts': merge_fine_counts([current['fine_counts'], removed_counts, build_fine_counts(added)]),
+        'first_seen': merge_first_seen([first_seen, build_first_seen(added)]),
+    }
+
+
+def fine_median(counts):
+    by_amount = counts.dropna(subset=['FINE AMOUNT']).groupby('FINE AMOUNT')['Rows'].sum()
+    return weighted_median(by_amount.index.to_numpy(dtype='float64'), by_amount.to_numpy())
+
+
+def weighted_median(amounts, rows):
+    # Same as Series.median() over the expanded amounts: an even count
+    # averages the two middle values. Amounts may repeat and needn't be sorted.
+    total = int(rows.sum())
+    if total == 0:
+        return np.nan
+    order = np.argsort(amounts, kind='stable')
+    amounts = amounts[order]
+    ends = rows[order].cumsum()
+    lower, upper = np.searchsorted(ends, [(total - 1) // 2, total // 2], side='right')
+    return (amounts[lower] + amounts[upper]) / 2
+
+
+def fine_box_stats(counts):
+    # The statistics Plotly would compute client-side from the expanded
+    # fines (default "linear" quartiles), with the whiskers at the smallest
+    # and largest fine as boxpoints=False draws them
+    by_amount = counts.dropna(subset=['FINE AMOUNT']).groupby('FINE AMOUNT')['Rows'].sum()
+    by_amount = by_amount[by_amount > 0]
+    if by_amount.empty:
+        return None
+    amounts = by_amount.index.to_numpy(dtype='float64')
+    ends = by_amount.to_numpy().cumsum()
+
+    q1, median, q3 = (_sorted_quantile(amounts, ends, p) for p in (0.25, 0.5, 0.75))
+    return pd.Series({
+        'q1': q1, 'median': median, 'q3': q3,
+        'lowerfence': amounts[0], 'upperfence': amounts[-1],
+    })
+
+
+def _sorted_quantile(amounts, ends, p):
+    # plotly.js Lib.interp over the expanded, sorted values
+    position = p * ends[-1] - 0.5
+    if position < 0:
+        return amounts[0]
+    if position > ends[-1] - 1:
+        return amounts[-1]
+    below, above = amounts[np.searchsorted(ends, [np.floor(position), np.ceil(position)], side='right')]
+    fraction = position % 1
+    return fraction * above + (1 - fraction) * below
@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+
+
+def fine_count_correlations(by_label_year, labels):
+    # Pearson r between yearly average fine and fined-violation count for
+    # every label at once. by_label_year is a (ShortLabel, Year) rollup of the
+    # cube; nothing passed in is modified. Returns the correlations, sorted
+    # ascending with undefined ones last, and each label's yearly series in
+    # that order.
+    table = by_label_year[by_label_year['ShortLabel'].isin(labels)]
+    fined = table[table['Count'] > 0]
+
+    counts = fined.pivot(index='ShortLabel', columns='Year', values='Count').reindex(labels)
+    fines = fined.pivot(index='ShortLabel', columns='Year', values='AvgFine').reindex(labels)
+    x, y = fines.to_numpy(dtype='float64'), counts.to_numpy(dtype='float64')
+    present = ~np.isnan(x) & ~np.isnan(y)
+    x, y = np.where(present, x, 0), np.where(present, y, 0)
+
+    n = present.sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        dx = np.where(present, x - x.sum(axis=1, keepdims=True) / n[:, None], 0)
+        dy = np.where(present, y - y.sum(axis=1, keepdims=True) / n[:, None], 0)
+        r = (dx * dy).sum(axis=1) / np.sqrt((dx ** 2).sum(axis=1) * (dy ** 2).sum(axis=1))
+    r[n < 2] = np.nan
+
+    correlations = (
+        pd.DataFrame({'ShortLabel': list(labels), 'Correlation': r})
+        .sort_values('Correlation', kind='stable', na_position='last', ignore_index=True)
+    )
+    series = {
+        label: frame.rename(columns={'Count': 'ViolationCount'})[['Year', 'ViolationCount', 'AvgFine']]
+        for label, frame in table.groupby('ShortLabel', sort=False)
+    }
+    return correlations, {label: series[label] for label in correlations['ShortLabel'] if label in series}
@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+
+from .aggregates import AGGREGATES, update_aggregates
+from .schema import apply_schema, concat_frames, parse_dates
+
+# Each export row is identified by its complaint/inquiry or violation number
+RECORD_KEYS = {
+    "complaints": "COMPLAINT/INQUIRY NUMBER",
+    "violations": "VIOLATION NUMBER",
+}
+
+
+# Stamped on every row by the export itself, so they change with each export
+# without the record changing; they are left out of the row hashes
+EXPORT_METADATA = ("EXPORT DATE",)
+
+
+def hash_rows(raw, key):
+    raw = raw.drop_duplicates(subset=key, keep="last")
+    data_columns = [column for column in raw.columns if column not in EXPORT_METADATA]
+    return pd.DataFrame({
+        key: raw[key].astype("string[pyarrow]"),
+        "RowHash": pd.util.hash_pandas_object(raw[data_columns], index=False).to_numpy(),
+    }, index=raw.index)
+
+
+def find_delta(raw, key, hashes):
+    # Returns the new and changed rows, the record numbers whose previous
+    # version has to go (changed and deleted ones) and the hashes of this export
+    current = hash_rows(raw, key)
+    positions = pd.Index(hashes[key]).get_indexer(current[key])
+    known = positions >= 0
+    unchanged = np.zeros(len(current), dtype=bool)
+    unchanged[known] = hashes["RowHash"].to_numpy()[positions[known]] == current["RowHash"].to_numpy()[known]
+
+    delta = current[~unchanged]
+    changed = delta[key][known[~unchanged]]
+    deleted = hashes[key][~hashes[key].isin(current[key])]
+    replaced = concat_frames([changed.to_frame(), deleted.to_frame()])[key]
+    return raw.loc[delta.index], replaced, current.reset_index(drop=True), len(deleted)
+
+
+def drop_records(frame, name, replaced):
+    stale = frame[RECORD_KEYS[name]].isin(replaced[name]).to_numpy()
+    return frame[~stale], frame[stale]
+
+
+def refresh_export_metadata(frame, raw, key):
+    # Metadata isn't hashed, so rows kept from the previous load take theirs
+    # from this export; it is usually one value for every row
+    updates = {}
+    for column in EXPORT_METADATA:
+        if column not in frame or column not in raw:
+            continue
+        if raw[column].nunique(dropna=False) == 1:
+            updates[column] = pd.Series(parse_dates(raw[column].iloc[:1]).iloc[0], index=frame.index)
+        else:
+            latest = raw.drop_duplicates(subset=key, keep="last").set_index(key)[column]
+            updates[column] = parse_dates(frame[key].astype(object).map(latest))
+    return frame.assign(**updates)
+
+
+def apply_increment(previous, raw_frames, schemas, prepare):
+    # Only new and changed rows are parsed, labelled and aggregated; they
+    # replace rows with the same record number, records missing from the
+    # export are dropped and everything else is kept
+    deltas, replaced, hashes = {}, {}, {}
+    for name, raw in raw_frames.items():
+        key = RECORD_KEYS[name]
+        delta, replaced[name], hashes[name], deleted = find_delta(raw, key, previous[f"{name}_hashes"])
+        deltas[name] = apply_schema(delta, schemas[name])
+        print(f"{name}: {len(delta):,} new or changed and {deleted:,} deleted rows of {len(raw):,}")
+
+    complaints_delta, violations_delta = prepare(deltas["complaints"], deltas["violations"])
+
+    complaints, _ = drop_records(previous["complaints"], "complaints", replaced)
+    violations, removed_violations = drop_records(previous["violations"], "violations", replaced)
+
+    merged = {
+        "complaints": concat_frames([complaints, complaints_delta]),
+        "violations": concat_frames([violations, violations_delta]),
+    }
+    frames = {
+        name: refresh_export_metadata(frame, raw_frames[name], RECORD_KEYS[name])
+        for name, frame in merged.items()
+    }
+    current = {name: previous[name] for name in AGGREGATES}
+    frames.update(update_aggregates(current, removed_violations, violations_delta, frames["violations"]))
+    for name, frame in hashes.items():
+        frames[f"{name}_hashes"] = frame
+    return frames
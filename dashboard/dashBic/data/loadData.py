@@ -1,21 +1,281 @@
+import hashlib
+import io
+import os
+import tempfile
+import urllib.request
+
 import pandas as pd
-from ..helpers.utils import get_short_label
+from ..helpers.utils import classify_rules
+from . import snapshot
+from .aggregates import AGGREGATES, build_aggregates, finish_aggregates, push_aggregates
+from .incremental import RECORD_KEYS, apply_increment, hash_rows
+from .schema import (
+    COMPLAINTS_SCHEMA, VIOLATIONS_SCHEMA, read_csv_with_schema, read_raw_csv, apply_schema,
+    parse_dates, report_memory
+)
+
+COMPLAINTS_URL = "https://drive.google.com/uc?export=download&id=1OHuktLCuMQLOPM3igyxDeFr7U2iTfKEH"
+VIOLATIONS_URL = "https://drive.google.com/uc?export=download&id=1SOaADySZRl_mHg--NA4M0ZiORSecljwI"
+
+# Sources can point at local CSVs (handy for offline work and testing)
+COMPLAINTS_SOURCE = os.environ.get("BIC_COMPLAINTS_SOURCE", COMPLAINTS_URL)
+VIOLATIONS_SOURCE = os.environ.get("BIC_VIOLATIONS_SOURCE", VIOLATIONS_URL)
+
+SNAPSHOT_DIR = os.environ.get("BIC_SNAPSHOT_DIR", os.path.join(os.path.dirname(__file__), "snapshots"))
+# Within this many seconds of the last check the snapshot is trusted without touching the sources
+SNAPSHOT_MAX_AGE = float(os.environ.get("BIC_SNAPSHOT_MAX_AGE", 6 * 60 * 60))
+DOWNLOAD_TIMEOUT = float(os.environ.get("BIC_DOWNLOAD_TIMEOUT", 60))
+# Also parse every column with inferred dtypes to report what the schema saves (doubles parse time)
+MEMORY_BASELINE = os.environ.get("BIC_MEMORY_BASELINE") == "1"
+# Keep per-record row hashes so later loads only parse new or changed rows
+INCREMENTAL = os.environ.get("BIC_INCREMENTAL") == "1"
+# Stream the violations in chunks of this many rows, keeping only the
+# aggregates so memory is bounded by the chunk and aggregate sizes (0 reads the whole file)
+CHUNK_ROWS = int(os.environ.get("BIC_CHUNK_ROWS", 0))
+
+SCHEMAS = {"complaints": COMPLAINTS_SCHEMA, "violations": VIOLATIONS_SCHEMA}
+# What a snapshot has to hold for each way of loading
+MODE_FRAMES = {
+    "full": ("complaints", "violations", *AGGREGATES),
+    "incremental": ("complaints", "violations", *AGGREGATES, "complaints_hashes", "violations_hashes"),
+    "streaming": ("complaints", *AGGREGATES),
+}
+
 
-def load_and_prepare_data():
-    complaints = pd.read_csv("https://drive.google.com/uc?export=download&id=1OHuktLCuMQLOPM3igyxDeFr7U2iTfKEH")
-    violations = pd.read_csv("https://drive.google.com/uc?export=download&id=1SOaADySZRl_mHg--NA4M0ZiORSecljwI")
+def prepare_data(complaints, violations):
+    complaints = prepare_complaints(complaints)
+    violations, unmatched = prepare_violations(violations)
+    report_unmatched_rules(unmatched)
+    return complaints, violations
 
+
+def prepare_complaints(complaints):
+    return _prepare_rows(complaints, 'DATE COMPLAINT/INQUIRY REPORTED ON')
+
+
+def prepare_violations(violations):
+    violations = _prepare_rows(violations, 'DATE VIOLATION ISSUED')
+    violations['ShortLabel'], unmatched = classify_rules(violations['DESCRIPTION OF RULE'])
+    return violations, unmatched
+
+
+def _prepare_rows(df, date_column):
     # Convert dates
-    complaints['DATE COMPLAINT/INQUIRY REPORTED ON'] = pd.to_datetime(complaints['DATE COMPLAINT/INQUIRY REPORTED ON'], errors='coerce')
-    violations['DATE VIOLATION ISSUED'] = pd.to_datetime(violations['DATE VIOLATION ISSUED'], errors='coerce')
+    df[date_column] = parse_dates(df[date_column])
+    if 'EXPORT DATE' in df:
+        df['EXPORT DATE'] = parse_dates(df['EXPORT DATE'])
+
+    # Filter by year and add Year
+    df = df[df[date_column].dt.year >= 2015].copy()
+    df['Year'] = df[date_column].dt.year.astype('int16')
+
+    # Filtering leaves categories for rows that no longer exist
+    for column in df.select_dtypes('category'):
+        df[column] = df[column].cat.remove_unused_categories()
+    return df
+
+
+def report_unmatched_rules(unmatched, limit=5):
+    if not unmatched:
+        return
+    print(f"{len(unmatched)} rule descriptions have no short label, e.g.:")
+    for description in unmatched[:limit]:
+        print(f"   - {str(description)[:80]}")
+
+
+def read_and_prepare(sources, raw=None):
+    raw = raw or {}
+    frames = {}
+    for name, source in sources.items():
+        frames[name] = read_source(source, raw.get(name), SCHEMAS[name])
+        if MEMORY_BASELINE:
+            report_memory(f"{name} (read)", frames[name], before=read_source(source, raw.get(name)))
+
+    complaints, violations = prepare_data(frames["complaints"], frames["violations"])
+    report_memory("complaints", complaints)
+    report_memory("violations", violations)
+    return {"complaints": complaints, "violations": violations, **build_aggregates(violations)}
+
+
+def read_and_prepare_streaming(sources, raw=None, chunk_rows=None):
+    # Only the aggregates are built; the prepared violations are never held in full
+    raw = raw or {}
+    chunk_rows = chunk_rows or CHUNK_ROWS
+    complaints = prepare_complaints(read_source(sources["complaints"], raw.get("complaints"), COMPLAINTS_SCHEMA))
+
+    levels = []
+    unmatched = {}
+    total_rows = 0
+    chunks = read_csv_with_schema(
+        open_source(sources["violations"], raw.get("violations")), VIOLATIONS_SCHEMA, chunksize=chunk_rows
+    )
+    with chunks:
+        for chunk in chunks:
+            total_rows += len(chunk)
+            violations, chunk_unmatched = prepare_violations(chunk)
+            unmatched.update(dict.fromkeys(chunk_unmatched))
+            push_aggregates(levels, build_aggregates(violations))
+
+    aggregates = finish_aggregates(levels)
+    report_unmatched_rules(list(unmatched))
+    report_memory("complaints", complaints)
+    print(f"violations: {total_rows:,} rows streamed in chunks of {chunk_rows:,}, "
+          f"{int(aggregates['cube']['Rows'].sum()):,} since 2015")
+    return {"complaints": complaints, **aggregates}
+
+
+def read_and_prepare_incremental(sources, raw, previous):
+    raw_frames = {
+        name: read_raw_csv(open_source(source, raw.get(name)), SCHEMAS[name])
+        for name, source in sources.items()
+    }
+    if previous is not None:
+        return apply_increment(previous, raw_frames, SCHEMAS, prepare_data)
+
+    # No row hashes yet: prepare everything once and start tracking
+    frames = {name: apply_schema(frame, SCHEMAS[name]) for name, frame in raw_frames.items()}
+    complaints, violations = prepare_data(frames["complaints"], frames["violations"])
+    frames = {"complaints": complaints, "violations": violations, **build_aggregates(violations)}
+    for name, frame in raw_frames.items():
+        frames[f"{name}_hashes"] = hash_rows(frame, RECORD_KEYS[name]).reset_index(drop=True)
+    return frames
+
+
+def fetch_source(source, spool_dir=None):
+    if snapshot.is_remote(source) and spool_dir:
+        return spool_source(source, spool_dir)
+    if snapshot.is_remote(source):
+        with urllib.request.urlopen(source, timeout=DOWNLOAD_TIMEOUT) as response:
+            raw = response.read()
+        return raw, snapshot.content_fingerprint(raw)
+    return None, snapshot.local_fingerprint(source)
+
+
+def spool_source(source, directory, block_size=1024 ** 2):
+    # Download to a temporary file in blocks so the export never sits in memory;
+    # returns the path in place of the raw bytes
+    os.makedirs(directory, exist_ok=True)
+    digest = hashlib.sha256()
+    with tempfile.NamedTemporaryFile(dir=directory, suffix=".csv.tmp", delete=False) as f:
+        try:
+            with urllib.request.urlopen(source, timeout=DOWNLOAD_TIMEOUT) as response:
+                for block in iter(lambda: response.read(block_size), b""):
+                    digest.update(block)
+                    f.write(block)
+        except BaseException:
+            f.close()
+            os.remove(f.name)
+            raise
+    return f.name, digest.hexdigest()
+
+
+def open_source(source, raw):
+    if isinstance(raw, bytes):
+        return io.BytesIO(raw)
+    return raw if raw is not None else source
+
+
+def read_source(source, raw, schema=None):
+    source = open_source(source, raw)
+    if schema is None:
+        return pd.read_csv(source)
+    return read_csv_with_schema(source, schema)
+
+
+def load_mode(incremental, streaming, use_snapshot=True):
+    if streaming:
+        return "streaming"
+    # Row hashes live in the snapshot, so without one every load is full
+    return "incremental" if incremental and use_snapshot else "full"
+
+
+def load_data(use_snapshot=True, max_age=None, current_version=None, incremental=None):
+    # Returns (version, frames) where frames holds complaints, the aggregates
+    # and (unless streaming) violations; the version changes only when a
+    # source or the load mode does. Returns None instead when the sources
+    # still match current_version.
+    incremental = INCREMENTAL if incremental is None else incremental
+    streaming = CHUNK_ROWS > 0
+    mode = load_mode(incremental, streaming, use_snapshot)
+    sources = {"complaints": COMPLAINTS_SOURCE, "violations": VIOLATIONS_SOURCE}
+    max_age = SNAPSHOT_MAX_AGE if max_age is None else max_age
+    manifest = snapshot.read_manifest(SNAPSHOT_DIR) if use_snapshot else None
+
+    # Fast path: a recently checked snapshot is served without any network
+    # I/O, as long as it was built the way this process loads
+    current = manifest and snapshot.has_frames(manifest, MODE_FRAMES[mode])
+    if current and snapshot.manifest_age(manifest) < max_age:
+        return read_snapshot_frames(manifest, current_version)
+
+    try:
+        fetched = {
+            name: fetch_source(source, SNAPSHOT_DIR if streaming else None)
+            for name, source in sources.items()
+        }
+    except Exception as e:
+        if manifest is None:
+            raise
+        print(f"Could not reach BIC sources ({e}); serving snapshot {manifest['version']}")
+        if not current:
+            print(f"Snapshot {manifest['version']} was built for {manifest.get('mode', 'another')} loads "
+                  f"and lacks frames {mode} loads need")
+        return read_snapshot_frames(manifest, current_version)
+
+    try:
+        return build_frames(sources, fetched, manifest, current_version, use_snapshot, incremental, mode)
+    finally:
+        # Spooled downloads are only needed until the frames are built
+        for raw, _ in fetched.values():
+            if isinstance(raw, str):
+                os.remove(raw)
+
+
+def build_frames(sources, fetched, manifest, current_version, use_snapshot, incremental, mode):
+    fingerprints = {name: fingerprint for name, (_, fingerprint) in fetched.items()}
+    version = snapshot.snapshot_version(fingerprints, mode)
+
+    # Sources and mode unchanged since the last build: skip parsing and preparation
+    if manifest and manifest["version"] == version and snapshot.has_frames(manifest, MODE_FRAMES[mode]):
+        snapshot.write_manifest(SNAPSHOT_DIR, manifest)
+        return read_snapshot_frames(manifest, current_version)
+    if version == current_version:
+        return None
+
+    raw = {name: raw for name, (raw, _) in fetched.items()}
+    if mode == "streaming":
+        if incremental:
+            # Updating in place needs the prepared violations, which streaming never keeps
+            print("BIC_INCREMENTAL has no effect while BIC_CHUNK_ROWS streams the violations; "
+                  "rebuilding the aggregates from the full export")
+        frames = read_and_prepare_streaming(sources, raw)
+    elif mode == "incremental":
+        previous = None
+        if manifest and all(f"{name}_hashes" in manifest["files"] for name in sources):
+            previous = snapshot.read_snapshot(SNAPSHOT_DIR, manifest)
+        frames = read_and_prepare_incremental(sources, raw, previous)
+    else:
+        frames = read_and_prepare(sources, raw)
+
+    if use_snapshot:
+        try:
+            manifest = snapshot.write_snapshot(SNAPSHOT_DIR, frames, fingerprints, version, {"mode": mode})
+        except OSError as e:
+            print(f"Could not write BIC snapshot to {SNAPSHOT_DIR}: {e}")
+        else:
+            # Re-open what was just written so this worker maps the shared copy too
+            if snapshot.MEMORY_MAP:
+                return read_snapshot_frames(manifest)
+
+    return version, frames
+
 
-    # Filter by year
-    complaints = complaints[complaints['DATE COMPLAINT/INQUIRY REPORTED ON'].dt.year >= 2015]
-    violations = violations[violations['DATE VIOLATION ISSUED'].dt.year >= 2015]
+def read_snapshot_frames(manifest, current_version=None):
+    if manifest["version"] == current_version:
+        return None
+    return manifest["version"], snapshot.read_snapshot(SNAPSHOT_DIR, manifest)
 
-    # Add Year and ShortLabel
-    complaints['Year'] = complaints['DATE COMPLAINT/INQUIRY REPORTED ON'].dt.year
-    violations['Year'] = violations['DATE VIOLATION ISSUED'].dt.year
-    violations['ShortLabel'] = violations['DESCRIPTION OF RULE'].apply(get_short_label)
 
-    return complaints, violations
\ No newline at end of file
+def load_and_prepare_data(use_snapshot=True, max_age=None):
+    # Streaming builds don't keep violation rows, so this gives None for them
+    _, frames = load_data(use_snapshot, max_age)
+    return frames["complaints"], frames.get("violations")
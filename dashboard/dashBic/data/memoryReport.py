@@ -0,0 +1,166 @@
+import dataclasses
+import gc
+import os
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from .schema import format_bytes
+
+# Serve the report on /memory (opt-in: it walks every frame column by column)
+MEMORY_REPORT_ENDPOINT = os.environ.get("BIC_MEMORY_REPORT") == "1"
+# A text column repeating its values this much or more would be smaller as a category
+CATEGORICAL_MAX_UNIQUE_RATIO = 0.5
+CATEGORICAL_MIN_ROWS = 100
+
+
+def format_size(num_bytes):
+    # Most aggregates are well under a megabyte
+    if num_bytes < 1024 ** 2:
+        return f"{num_bytes / 1024:,.1f} KB"
+    return format_bytes(num_bytes)
+
+
+def column_usage(frames):
+    # Deep bytes per column summed over one or more frames with the same layout
+    usage = {}
+    for df in frames:
+        sizes = df.memory_usage(deep=True, index=False)
+        for column in df.columns:
+            entry = usage.setdefault(column, {"column": str(column), "dtype": str(df[column].dtype), "bytes": 0})
+            entry["bytes"] += int(sizes[column])
+    return list(usage.values())
+
+
+def categorical_candidate(values):
+    # Object/string columns with few distinct values; returns the bytes the
+    # column would take as a category, or None
+    if isinstance(values.dtype, pd.CategoricalDtype) or not (
+        values.dtype == object or isinstance(values.dtype, pd.StringDtype)
+    ):
+        return None
+    if len(values) < CATEGORICAL_MIN_ROWS or values.nunique() > len(values) * CATEGORICAL_MAX_UNIQUE_RATIO:
+        return None
+    return int(values.astype("category").memory_usage(deep=True, index=False))
+
+
+def frame_report(name, frames):
+    frames = [frames] if isinstance(frames, pd.DataFrame) else list(frames)
+    columns = column_usage(frames)
+    if len(frames) == 1:
+        for entry in columns:
+            entry["categorical_bytes"] = categorical_candidate(frames[0][entry["column"]])
+    return {
+        "name": name,
+        "frames": len(frames),
+        "rows": sum(len(df) for df in frames),
+        "bytes": sum(entry["bytes"] for entry in columns)
+                 + sum(int(df.index.memory_usage(deep=True)) for df in frames),
+        "columns": columns,
+    }
+
+
+def array_report(name, holder):
+    # NumPy arrays held by a dataclass (directly or in tuples), per field
+    columns = []
+    for field in dataclasses.fields(holder):
+        value = getattr(holder, field.name)
+        arrays = value if isinstance(value, tuple) else (value,)
+        arrays = [array for array in arrays if isinstance(array, np.ndarray)]
+        if arrays:
+            columns.append({
+                "column": field.name,
+                "dtype": str(arrays[0].dtype),
+                "bytes": sum(array.nbytes for array in arrays),
+            })
+    return {"name": name, "frames": 0, "rows": None, "bytes": sum(c["bytes"] for c in columns), "columns": columns}
+
+
+def dataset_reports(dataset):
+    reports = []
+    for field in ("complaints", "violations", "cube", "fine_counts", "first_seen", "trends"):
+        frame = getattr(dataset, field)
+        if frame is not None:
+            reports.append(frame_report(field, frame))
+    for metric, frame in dataset.rankings.top.items():
+        reports.append(frame_report(f"rankings.top[{metric}]", frame))
+    if dataset.rankings.series:
+        reports.append(frame_report("rankings.series", dataset.rankings.series.values()))
+    reports.append(array_report("summary", dataset.summary))
+    return reports
+
+
+def tab_allocations(dataset, render, tabs):
+    # Peak traced allocations while rendering each tab, and what the
+    # rendered component still holds once it returns. Arrow buffers are not
+    # traced; the tab renderers work on the NumPy-backed aggregates. Each tab
+    # is rendered once beforehand so lazy imports and plotly's own caches
+    # don't count as the request's. tracemalloc sees every thread, so this
+    # only means something in a process serving nothing else (the CLI).
+    results = []
+    for tab in tabs:
+        render(tab, dataset)
+        gc.collect()
+        tracemalloc.start()
+        try:
+            content = render(tab, dataset)
+            retained, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        del content
+        results.append({"tab": tab, "peak_bytes": peak, "retained_bytes": retained})
+    return results
+
+
+def memory_report(dataset, caches=None, render=None, tabs=()):
+    # caches maps a name to an object with size_bytes (and optionally __len__)
+    report = {"version": dataset.version, "frames": dataset_reports(dataset), "caches": [], "tabs": []}
+    for name, cache in (caches or {}).items():
+        report["caches"].append({
+            "name": name,
+            "bytes": cache.size_bytes,
+            "entries": len(cache) if hasattr(cache, "__len__") else None,
+        })
+    if render is not None and tabs:
+        report["tabs"] = tab_allocations(dataset, render, tabs)
+    report["total_bytes"] = sum(frame["bytes"] for frame in report["frames"])
+    return report
+
+
+def frame_lines(frame, columns):
+    rows = "" if frame["rows"] is None else f"{frame['rows']:,} rows"
+    if frame["frames"] > 1:
+        rows += f" in {frame['frames']} frames"
+    lines = [f"{frame['name']:<28} {format_size(frame['bytes']):>12}  {rows}"]
+    if columns:
+        for column in sorted(frame["columns"], key=lambda c: -c["bytes"]):
+            line = f"    {column['column']:<36} {column['dtype']:<16} {format_size(column['bytes']):>12}"
+            if column.get("categorical_bytes") is not None:
+                line += f"  <- {format_size(column['categorical_bytes'])} as category"
+            lines.append(line)
+    return lines
+
+
+def format_report(report, columns=True):
+    # report["raw"], when present, lists frames the app doesn't hold; they
+    # are shown apart and left out of the total
+    lines = [f"Data version {report['version']}: {format_size(report['total_bytes'])} in frames and arrays"]
+    for frame in report["frames"]:
+        lines.extend(frame_lines(frame, columns))
+
+    if report.get("raw"):
+        lines.append("Sources read with inferred dtypes (not held by the app, not in the total):")
+        for frame in report["raw"]:
+            lines.extend(frame_lines(frame, columns))
+
+    for cache in report["caches"]:
+        entries = "" if cache["entries"] is None else f"  {cache['entries']:,} entries"
+        lines.append(f"cache {cache['name']:<22} {format_size(cache['bytes']):>12}{entries}")
+
+    if report["tabs"]:
+        lines.append(f"{'tab render':<28} {'peak':>12} {'retained':>12}")
+        for tab in report["tabs"]:
+            lines.append(f"{tab['tab']:<28} {format_size(tab['peak_bytes']):>12} "
+                         f"{format_size(tab['retained_bytes']):>12}")
+    return "\n".join(lines)
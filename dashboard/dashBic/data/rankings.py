@@ -0,0 +1,64 @@
+from dataclasses import dataclass
+
+import pandas as pd
+
+from .cube import rollup
+
+MAX_TOP_K = 100
+# Ranking metric -> account summary column
+RANK_METRICS = {
+    'TotalFines': 'TotalFines',
+    'ViolationCount': 'ViolationCount',
+    'AverageFine': 'AverageFine',
+}
+
+
+# The top MAX_TOP_K accounts under each metric, with every one of those
+# accounts' yearly series, built once per data version so the Frequent
+# Violators toggles are lookups
+@dataclass(frozen=True)
+class AccountRankings:
+    top: dict
+    series: dict
+    total_violations: int
+    total_fines: float
+
+
+def build_rankings(cube, max_k=MAX_TOP_K):
+    # Only violations with both an account and a fine amount are ranked
+    fined = cube[cube['Count'] > 0]
+    account_summary = (
+        rollup(fined, ['ACCOUNT NAME'])
+        .rename(columns={'Count': 'ViolationCount', 'AvgFine': 'AverageFine'})
+    )
+    top = {
+        metric: account_summary.sort_values(by=column, ascending=False).head(max_k).reset_index(drop=True)
+        for metric, column in RANK_METRICS.items()
+    }
+
+    ranked = pd.concat([frame['ACCOUNT NAME'] for frame in top.values()]).unique()
+    yearly = (
+        rollup(fined[fined['ACCOUNT NAME'].isin(ranked)], ['ACCOUNT NAME', 'Year'])
+        .rename(columns={'Count': 'ViolationCount', 'AvgFine': 'AverageFines'})
+    )
+    series = {
+        account: frame.reset_index(drop=True)
+        for account, frame in yearly.groupby('ACCOUNT NAME', sort=False)
+    }
+
+    return AccountRankings(
+        top=top,
+        series=series,
+        total_violations=account_summary['ViolationCount'].sum(),
+        total_fines=account_summary['TotalFines'].sum(),
+    )
+
+
+def top_accounts(rankings, metric, k=10):
+    if not 0 < k <= MAX_TOP_K:
+        raise ValueError(f"k must be between 1 and {MAX_TOP_K}, got {k}")
+    return rankings.top[metric].head(k)
+
+
+def account_series(rankings, account):
+    return rankings.series[account]
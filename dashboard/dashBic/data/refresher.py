@@ -0,0 +1,45 @@
+import os
+import threading
+
+from .store import build_dataset
+
+# Seconds between source checks; 0 leaves the data fixed at whatever was loaded on boot
+REFRESH_INTERVAL = float(os.environ.get("BIC_REFRESH_INTERVAL", 0))
+
+
+class DataRefresher:
+    def __init__(self, store, interval=REFRESH_INTERVAL, build=build_dataset):
+        self.store = store
+        self.interval = interval
+        self.build = build
+        self._stop = threading.Event()
+        self._thread = None
+
+    def refresh_once(self):
+        # Everything is built off to the side; callbacks keep using the
+        # current dataset until publish swaps in the finished one
+        dataset = self.build(max_age=0, current_version=self.store.version)
+        if dataset is None:
+            return False
+        return self.store.publish(dataset)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                if self.refresh_once():
+                    print(f"BIC data refreshed to version {self.store.version}")
+            except Exception as e:
+                print(f"BIC data refresh failed, keeping version {self.store.version}: {e}")
+
+    def start(self):
+        if self.interval <= 0 or (self._thread and self._thread.is_alive()):
+            return False
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="bic-data-refresher", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
@@ -0,0 +1,85 @@
+import pandas as pd
+
+# Only the columns the dashboards read are kept; everything else in the
+# exports is dropped at parse time
+COMPLAINTS_SCHEMA = {
+    "COMPLAINT/INQUIRY NUMBER": "string[pyarrow]",
+    "LICENSE TYPE": "category",
+    "ACCOUNT NAME": "category",
+    "DATE COMPLAINT/INQUIRY REPORTED ON": "string[pyarrow]",
+    "COMPLAINT/INQUIRY BOROUGH": "category",
+    "EXPORT DATE": "string[pyarrow]",
+}
+
+VIOLATIONS_SCHEMA = {
+    "VIOLATION NUMBER": "string[pyarrow]",
+    "ACCOUNT NAME": "category",
+    "DATE VIOLATION ISSUED": "string[pyarrow]",
+    "FINE AMOUNT": "float32",
+    "DESCRIPTION OF RULE": "category",
+    "BOROUGH OF VIOLATION": "category",
+    "EXPORT DATE": "string[pyarrow]",
+}
+
+DATE_FORMAT = "%m/%d/%Y"
+
+
+def read_csv_with_schema(source, schema, **kwargs):
+    return pd.read_csv(
+        source,
+        usecols=lambda column: column in schema,
+        dtype=schema,
+        **kwargs
+    )
+
+
+def read_raw_csv(source, schema, **kwargs):
+    # Pruned but untyped: every value stays the exact string from the export
+    return pd.read_csv(
+        source,
+        usecols=lambda column: column in schema,
+        dtype=str,
+        **kwargs
+    )
+
+
+def apply_schema(raw, schema):
+    return raw.astype({column: dtype for column, dtype in schema.items() if column in raw})
+
+
+def concat_frames(frames):
+    # pd.concat falls back to object when categoricals disagree on their
+    # categories, so align them on the union first
+    frames = list(frames)
+    for column in frames[0].columns:
+        if not isinstance(frames[0][column].dtype, pd.CategoricalDtype):
+            continue
+        categories = frames[0][column].cat.categories
+        for df in frames[1:]:
+            categories = categories.union(df[column].cat.categories, sort=False)
+        frames = [df.assign(**{column: df[column].cat.set_categories(categories)}) for df in frames]
+    return pd.concat(frames, ignore_index=True)
+
+
+def parse_dates(values, date_format=DATE_FORMAT):
+    parsed = pd.to_datetime(values, format=date_format, errors="coerce")
+    # Fall back to inference for anything not in the export's usual format
+    misses = parsed.isna() & values.notna()
+    if misses.any():
+        parsed[misses] = pd.to_datetime(values[misses], errors="coerce")
+    return parsed
+
+
+def frame_memory(df):
+    return int(df.memory_usage(deep=True).sum())
+
+
+def format_bytes(num_bytes):
+    return f"{num_bytes / 1024 ** 2:,.1f} MB"
+
+
+def report_memory(name, after, before=None):
+    line = f"{name}: {len(after):,} rows, {format_bytes(frame_memory(after))}"
+    if before is not None:
+        line += f" (was {format_bytes(frame_memory(before))} with all columns and inferred dtypes)"
+    print(line)
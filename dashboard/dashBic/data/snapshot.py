@@ -0,0 +1,170 @@
+import hashlib
+import json
+import os
+import time
+from urllib.parse import urlparse
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+# Bump whenever the prepared frames change shape so old snapshots get rebuilt
+SNAPSHOT_FORMAT = 7
+MANIFEST_NAME = "manifest.json"
+KEEP_VERSIONS = 2
+# Memory-map snapshot files so every worker on the host shares one copy through the page cache
+MEMORY_MAP = os.environ.get("BIC_MEMORY_MAP", "1") == "1"
+
+
+def is_remote(source):
+    return urlparse(str(source)).scheme in ("http", "https")
+
+
+def local_fingerprint(path):
+    stat = os.stat(path)
+    return f"{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def content_fingerprint(raw_bytes):
+    return hashlib.sha256(raw_bytes).hexdigest()
+
+
+def snapshot_version(fingerprints, mode):
+    # The load mode decides which frames a snapshot holds, so switching it
+    # gives a new version and a rebuild rather than a snapshot missing frames
+    payload = json.dumps({"format": SNAPSHOT_FORMAT, "sources": fingerprints, "mode": mode}, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def has_frames(manifest, names):
+    return all(name in manifest["files"] for name in names)
+
+
+def read_manifest(directory):
+    try:
+        with open(os.path.join(directory, MANIFEST_NAME)) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("format") != SNAPSHOT_FORMAT:
+        return None
+    return manifest
+
+
+def manifest_age(manifest):
+    return time.time() - manifest["checked_at"]
+
+
+def read_snapshot(directory, manifest, memory_map=None):
+    memory_map = MEMORY_MAP if memory_map is None else memory_map
+    return {
+        name: read_frame(os.path.join(directory, filename), memory_map)
+        for name, filename in manifest["files"].items()
+    }
+
+
+def read_frame(path, memory_map=True):
+    if not memory_map:
+        return pd.read_feather(path)
+    # Single-chunk columns without nulls come back as read-only numpy views
+    # into the mapped file; only dictionaries and nullable columns are copied
+    return feather.read_table(path, memory_map=True).to_pandas(split_blocks=True, types_mapper=_arrow_strings)
+
+
+def _arrow_strings(arrow_type):
+    # Leave strings in the mapped Arrow buffers instead of building Python objects
+    if arrow_type in (pa.string(), pa.large_string()):
+        return pd.StringDtype("pyarrow")
+    return None
+
+
+def to_table(df):
+    table = pa.Table.from_pandas(df.reset_index(drop=True), preserve_index=False)
+    # Keep NaN/NaT as ordinary values instead of nulls so float and date
+    # columns can be mapped without a conversion copy
+    for i, name in enumerate(table.column_names):
+        dtype = df[name].dtype
+        if not isinstance(dtype, np.dtype):
+            continue
+        if dtype.kind == "f":
+            table = table.set_column(i, name, pa.array(df[name].to_numpy(), from_pandas=False))
+        elif dtype.kind == "M":
+            # pyarrow turns NaT into nulls even with from_pandas=False, so the
+            # raw int64 values are relabelled as timestamps instead
+            values = pa.array(df[name].to_numpy().view("int64"))
+            table = table.set_column(i, name, values.view(pa.timestamp(np.datetime_data(dtype)[0])))
+    return table.combine_chunks()
+
+
+def write_frame(df, path):
+    table = to_table(df)
+    feather.write_feather(table, path, compression="uncompressed", chunksize=max(len(table), 1))
+
+
+def _replace_atomically(path, write):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def write_manifest(directory, manifest):
+    manifest = dict(manifest, checked_at=time.time())
+
+    def write(tmp_path):
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f, indent=2)
+
+    _replace_atomically(os.path.join(directory, MANIFEST_NAME), write)
+    return manifest
+
+
+def write_snapshot(directory, frames, fingerprints, version, extra=None):
+    os.makedirs(directory, exist_ok=True)
+
+    # Files are named by version and never rewritten, so a worker reading the
+    # previous manifest keeps seeing a consistent set while a new one lands
+    files = {}
+    for name, df in frames.items():
+        filename = f"{name}-{version}.feather"
+        _replace_atomically(
+            os.path.join(directory, filename),
+            lambda tmp_path, df=df: write_frame(df, tmp_path),
+        )
+        files[name] = filename
+
+    manifest = write_manifest(directory, {
+        "format": SNAPSHOT_FORMAT,
+        "version": version,
+        "sources": fingerprints,
+        "files": files,
+        "built_at": time.time(),
+        **(extra or {}),
+    })
+    _prune_old_versions(directory, version)
+    return manifest
+
+
+def _prune_old_versions(directory, current_version):
+    snapshots = {}
+    for filename in os.listdir(directory):
+        if filename.endswith(".feather") and "-" in filename:
+            version = filename.rsplit("-", 1)[1][:-len(".feather")]
+            path = os.path.join(directory, filename)
+            snapshots.setdefault(version, []).append(path)
+
+    stale = sorted(
+        (v for v in snapshots if v != current_version),
+        key=lambda v: max(os.path.getmtime(p) for p in snapshots[v]),
+        reverse=True,
+    )[KEEP_VERSIONS - 1:]
+    for version in stale:
+        for path in snapshots[version]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
@@ -0,0 +1,89 @@
+import threading
+import time
+from dataclasses import dataclass
+
+import pandas as pd
+
+from .loadData import load_data
+from .rankings import AccountRankings, build_rankings
+from .summary import SummaryIndex, build_summary_index
+from .trends import build_trends
+
+
+# Everything a callback needs for one version of the data. Datasets are
+# never modified after they are built; a refresh publishes a new one.
+@dataclass(frozen=True)
+class Dataset:
+    version: str
+    complaints: pd.DataFrame
+    # None when the violations were streamed straight into the aggregates
+    violations: pd.DataFrame | None
+    cube: pd.DataFrame
+    fine_counts: pd.DataFrame
+    first_seen: pd.DataFrame
+    summary: SummaryIndex
+    trends: pd.DataFrame
+    rankings: AccountRankings
+    loaded_at: float
+
+
+def build_dataset(use_snapshot=True, max_age=None, current_version=None):
+    loaded = load_data(use_snapshot, max_age, current_version)
+    if loaded is None:
+        return None
+
+    return dataset_from_frames(*loaded)
+
+
+def dataset_from_frames(version, frames):
+    return Dataset(
+        version=version,
+        complaints=frames["complaints"],
+        violations=frames.get("violations"),
+        cube=frames["cube"],
+        fine_counts=frames["fine_counts"],
+        first_seen=frames["first_seen"],
+        summary=build_summary_index(frames["cube"], frames["fine_counts"]),
+        trends=build_trends(frames["complaints"], frames["cube"], frames["first_seen"]),
+        rankings=build_rankings(frames["cube"]),
+        loaded_at=time.time(),
+    )
+
+
+class DataStore:
+    def __init__(self):
+        self._dataset = None
+        self._lock = threading.Lock()
+        self._listeners = []
+
+    def get(self):
+        # Callbacks should call this once and use the returned dataset
+        # throughout, so a refresh mid-request can't mix two versions
+        dataset = self._dataset
+        if dataset is None:
+            raise RuntimeError("BIC data has not been loaded yet")
+        return dataset
+
+    @property
+    def version(self):
+        dataset = self._dataset
+        return dataset.version if dataset else None
+
+    def publish(self, dataset):
+        with self._lock:
+            if self._dataset is not None and self._dataset.version == dataset.version:
+                return False
+            self._dataset = dataset
+            listeners = list(self._listeners)
+
+        for listener in listeners:
+            listener(dataset)
+        return True
+
+    def subscribe(self, listener):
+        with self._lock:
+            self._listeners.append(listener)
+
+
+# Shared by every callback in the process
+store = DataStore()
@@ -0,0 +1,89 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+from .aggregates import weighted_median
+from .cube import rollup
+
+
+# Per-year building blocks for the overview cards. Any year range is answered
+# from these in O(years): prefix sums for the additive totals, per-year
+# extremes, each year's sorted fine amounts with their counts for an exact
+# median, and a year-by-account presence matrix for distinct accounts.
+@dataclass(frozen=True)
+class SummaryIndex:
+    years: np.ndarray
+    rows: np.ndarray
+    counts: np.ndarray
+    total_fines: np.ndarray
+    max_fines: np.ndarray
+    min_positive_fines: np.ndarray
+    fine_amounts: tuple
+    fine_rows: tuple
+    accounts: np.ndarray
+
+
+def prefix_sums(values):
+    return np.concatenate([[0], np.cumsum(values)])
+
+
+def build_summary_index(cube, fine_counts):
+    yearly = rollup(cube, ['Year'])
+    years = yearly['Year'].to_numpy()
+
+    fines = (
+        fine_counts.dropna(subset=['FINE AMOUNT'])
+        .groupby(['Year', 'FINE AMOUNT'])['Rows']
+        .sum()
+        .reset_index()
+    )
+    by_year = dict(tuple(fines.groupby('Year')))
+    amounts, rows = [], []
+    for year in years:
+        year_fines = by_year.get(year, fines.iloc[:0])
+        amounts.append(year_fines['FINE AMOUNT'].to_numpy(dtype='float64'))
+        rows.append(year_fines['Rows'].to_numpy())
+
+    codes = cube['ACCOUNT NAME'].cat.codes.to_numpy()
+    year_positions = np.searchsorted(years, cube['Year'].to_numpy())
+    accounts = np.zeros((len(years), len(cube['ACCOUNT NAME'].cat.categories)), dtype=bool)
+    named = codes >= 0
+    accounts[year_positions[named], codes[named]] = True
+
+    return SummaryIndex(
+        years=years,
+        rows=prefix_sums(yearly['Rows'].to_numpy()),
+        counts=prefix_sums(yearly['Count'].to_numpy()),
+        total_fines=prefix_sums(yearly['TotalFines'].to_numpy(dtype='float64')),
+        max_fines=yearly['MaxFine'].to_numpy(dtype='float64'),
+        min_positive_fines=yearly['MinPositiveFine'].to_numpy(dtype='float64'),
+        fine_amounts=tuple(amounts),
+        fine_rows=tuple(rows),
+        accounts=accounts,
+    )
+
+
+def summarize(index, start, end):
+    lo = np.searchsorted(index.years, start, side='left')
+    hi = np.searchsorted(index.years, end, side='right')
+    if lo == hi:
+        return {
+            "total_violations": 0, "total_fines": 0.0, "avg_fine": np.nan, "median_fine": np.nan,
+            "max_fine": np.nan, "min_fine": np.nan, "total_accounts": 0,
+        }
+
+    total_violations = int(index.rows[hi] - index.rows[lo])
+    fined = int(index.counts[hi] - index.counts[lo])
+    total_fines = index.total_fines[hi] - index.total_fines[lo]
+    return {
+        "total_violations": total_violations,
+        "total_fines": total_fines,
+        "avg_fine": total_fines / fined if fined else np.nan,
+        "median_fine": weighted_median(
+            np.concatenate(index.fine_amounts[lo:hi]), np.concatenate(index.fine_rows[lo:hi])
+        ),
+        # fmax/fmin skip years where every fine is missing
+        "max_fine": np.fmax.reduce(index.max_fines[lo:hi]),
+        "min_fine": np.fmin.reduce(index.min_positive_fines[lo:hi]),
+        "total_accounts": int(index.accounts[lo:hi].any(axis=0).sum()),
+    }
@@ -0,0 +1,26 @@
+import pandas as pd
+
+from .cube import rollup
+
+FIRST_YEAR, LAST_YEAR = 2015, 2025
+
+
+def build_trends(complaints, cube, first_seen):
+    # One row per year with everything the trends tab plots, built once per
+    # dataset rather than per visit. The cube and first-seen table it reads
+    # are kept up to date incrementally by the loader.
+    yearly = rollup(cube, ['Year']).set_index('Year')
+    trends = pd.DataFrame({
+        'Complaints': complaints.groupby('Year').size(),
+        'Violations': yearly['Rows'],
+        'AverageFine': yearly['AvgFine'],
+    }).rename_axis('Year')
+
+    first_seen_years = first_seen['FirstSeen'].dt.year
+    new_types = first_seen_years[first_seen_years.between(FIRST_YEAR, LAST_YEAR)].value_counts()
+    trends['NewViolationTypes'] = new_types.reindex(trends.index, fill_value=0)
+    # Years that added no rule type get no cumulative bar, as before
+    trends['CumulativeViolationTypes'] = (
+        trends['NewViolationTypes'].cumsum().where(trends['NewViolationTypes'] > 0)
+    )
+    return trends.reset_index()
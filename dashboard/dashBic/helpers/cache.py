@@ -0,0 +1,266 @@
+import functools
+import hashlib
+import json
+import os
+from importlib import metadata
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+from plotly.io.json import to_json_plotly
+
+RENDER_CACHE_BYTES = int(float(os.environ.get("BIC_RENDER_CACHE_MB", 64)) * 1024 ** 2)
+
+# Callback results shared by every worker on the host through one SQLite
+# file; BIC_CALLBACK_CACHE_MB=0 turns it off
+CALLBACK_CACHE_PATH = os.environ.get(
+    "BIC_CALLBACK_CACHE_PATH", os.path.join(tempfile.gettempdir(), "bic-callbacks.sqlite3")
+)
+CALLBACK_CACHE_BYTES = int(float(os.environ.get("BIC_CALLBACK_CACHE_MB", 256)) * 1024 ** 2)
+CALLBACK_CACHE_TTL = float(os.environ.get("BIC_CALLBACK_CACHE_TTL", 6 * 60 * 60))
+# A hit only records its read time for the LRU when the last one is older
+# than this, so reads rarely need the file's write lock
+ACCESS_RESOLUTION = 60
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# The app's own package and the helpers it shares with the other dashboards
+SOURCE_DIRS = (PACKAGE_DIR, os.path.join(os.path.dirname(PACKAGE_DIR), "shared"))
+# Libraries whose upgrades change the rendered output
+RENDERING_PACKAGES = ("dash", "dash-bootstrap-components", "plotly", "pandas", "numpy")
+
+
+@functools.lru_cache(maxsize=None)
+def build_fingerprint(roots=SOURCE_DIRS):
+    # The app's source, the BIC_* settings and the rendering libraries'
+    # versions. Cached results are keyed by it, so after a deploy that
+    # changes any of them the new workers never read the old build's output.
+    digest = hashlib.sha256()
+    for root in roots:
+        for directory, dirnames, filenames in os.walk(root):
+            dirnames[:] = sorted(name for name in dirnames if name != "__pycache__")
+            for filename in sorted(filenames):
+                if filename.endswith((".py", ".js", ".css")):
+                    path = os.path.join(directory, filename)
+                    digest.update(os.path.relpath(path, os.path.dirname(root)).encode())
+                    with open(path, "rb") as f:
+                        digest.update(f.read())
+    settings = {name: value for name, value in os.environ.items() if name.startswith("BIC_")}
+    versions = {}
+    for package in RENDERING_PACKAGES:
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            versions[package] = None
+    digest.update(json.dumps([settings, versions], sort_keys=True).encode())
+    return digest.hexdigest()[:16]
+
+
+class RenderCache:
+    # LRU of rendered component trees, stored as serialized JSON so the
+    # memory bound is exact and a hit only costs a json.loads. Dash sends
+    # the plain dicts exactly as it would the original components.
+    def __init__(self, max_bytes=RENDER_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return json.loads(payload)
+
+    def put(self, key, value):
+        # BIC_RENDER_CACHE_MB=0 turns it off without paying for serialization
+        if self.max_bytes <= 0:
+            return
+        payload = to_json_plotly(value)
+        if len(payload) > self.max_bytes:
+            return
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous)
+            self._entries[key] = payload
+            self._bytes += len(payload)
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    @property
+    def size_bytes(self):
+        return self._bytes
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class CallbackCache:
+    # On-disk LRU of callback results keyed by callback name, inputs, data
+    # version and build fingerprint. Versions are source fingerprints, so
+    # every worker of a deploy computes the same key and a result rendered by
+    # one is served by all. Entries expire after ttl seconds; past max_bytes
+    # the least recently read go first.
+    def __init__(self, path=CALLBACK_CACHE_PATH, max_bytes=CALLBACK_CACHE_BYTES, ttl=CALLBACK_CACHE_TTL,
+                 fingerprint=None):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.fingerprint = fingerprint or (build_fingerprint() if max_bytes > 0 else None)
+        self._local = threading.local()
+        self._warned = False
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self):
+        return self.max_bytes > 0
+
+    def _connection(self):
+        # One connection per thread, reopened after a fork so gunicorn
+        # workers never share the master's handle
+        connection = getattr(self._local, "connection", None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, payload BLOB NOT NULL, size INTEGER NOT NULL, "
+                "expires REAL NOT NULL, accessed REAL NOT NULL)"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)")
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def _failed(self, error):
+        # A broken cache file must never fail a callback; it just stops caching
+        if not self._warned:
+            print(f"Callback cache at {self.path} unavailable ({error}); computing results directly")
+            self._warned = True
+
+    def key(self, name, args, kwargs, version):
+        raw = json.dumps([self.fingerprint, name, version, args, kwargs], sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def _count(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, key):
+        now = time.time()
+        try:
+            connection = self._connection()
+            row = connection.execute(
+                "SELECT payload, expires, accessed FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or row[1] <= now:
+                self._count(False)
+                return None
+            if now - row[2] > ACCESS_RESOLUTION:
+                connection.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+        except sqlite3.Error as e:
+            self._failed(e)
+            return None
+        self._count(True)
+        return json.loads(row[0])
+
+    def put(self, key, value):
+        payload = to_json_plotly(value).encode()
+        if len(payload) > self.max_bytes:
+            return
+
+        now = time.time()
+        try:
+            connection = self._connection()
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                connection.execute(
+                    "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)",
+                    (key, payload, len(payload), now + self.ttl, now),
+                )
+                connection.execute("DELETE FROM entries WHERE expires <= ?", (now,))
+                self._evict(connection)
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+        except sqlite3.Error as e:
+            self._failed(e)
+
+    def _evict(self, connection):
+        excess = connection.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0] - self.max_bytes
+        if excess <= 0:
+            return
+        evicted = []
+        for key, size in connection.execute("SELECT key, size FROM entries ORDER BY accessed"):
+            evicted.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        connection.executemany("DELETE FROM entries WHERE key = ?", evicted)
+
+    def clear(self):
+        try:
+            self._connection().execute("DELETE FROM entries")
+        except sqlite3.Error as e:
+            self._failed(e)
+
+    @property
+    def size_bytes(self):
+        try:
+            return self._connection().execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        except sqlite3.Error as e:
+            self._failed(e)
+            return 0
+
+    def cached(self, snapshot, local=None):
+        # Decorator for Dash callbacks; place it under @app.callback.
+        # snapshot() returns the dataset the result is computed from (any
+        # object with a version). It is taken once per call and passed to the
+        # callback after its inputs, so the key and the result always come
+        # from the same data even if a refresh lands in between. local is an
+        # optional per-process RenderCache checked first, so repeat requests
+        # a worker has already answered never touch the file.
+        def decorator(callback):
+            name = f"{callback.__module__}.{callback.__qualname__}"
+
+            @functools.wraps(callback)
+            def wrapper(*args, **kwargs):
+                dataset = snapshot()
+                if not self.enabled and local is None:
+                    return callback(*args, dataset, **kwargs)
+                key = self.key(name, args, kwargs, dataset.version)
+                if local is not None:
+                    value = local.get(key)
+                    if value is not None:
+                        return value
+                value = self.get(key) if self.enabled else None
+                if value is None:
+                    value = callback(*args, dataset, **kwargs)
+                    if self.enabled:
+                        self.put(key, value)
+                if local is not None:
+                    local.put(key, value)
+                return value
+            return wrapper
+        return decorator
@@ -0,0 +1,83 @@
+import math
+import os
+
+import plotly.graph_objects as go
+import plotly.io as pio
+from plotly.subplots import make_subplots
+
+from ...shared.figures import typed_array
+
+# Tab ids (comma separated) whose small multiples are drawn as one subplot
+# grid instead of one dcc.Graph per panel, e.g.
+# BIC_GRID_TABS="fine-violation relationships,frequent violators"
+GRID_TABS = {tab.strip() for tab in os.environ.get("BIC_GRID_TABS", "").split(",") if tab.strip()}
+PANEL_HEIGHT = 300
+
+TEMPLATE = "bic_dark"
+BACKGROUND = '#1e1e1e'
+
+
+def register_template():
+    # Every figure carries its template inline, so the default "plotly" one
+    # (~7 KB, mostly colorscales and defaults for trace types never drawn
+    # here) is trimmed to what bar, scatter and box charts use, with the
+    # dashboard's dark background and font baked in. It is registered by
+    # name only: every figure asks for it with template=TEMPLATE, so other
+    # figures in the process keep plotly's default
+    base = pio.templates["plotly"]
+    pio.templates[TEMPLATE] = go.layout.Template(
+        layout=dict(
+            autotypenumbers=base.layout.autotypenumbers,
+            colorway=base.layout.colorway,
+            coloraxis=base.layout.coloraxis,
+            font=dict(color='white'),
+            hoverlabel=base.layout.hoverlabel,
+            hovermode=base.layout.hovermode,
+            paper_bgcolor=BACKGROUND,
+            plot_bgcolor=BACKGROUND,
+            title=base.layout.title,
+            xaxis=base.layout.xaxis,
+            yaxis=base.layout.yaxis,
+        ),
+        data=dict(bar=base.data.bar, scatter=base.data.scatter),
+    )
+
+
+register_template()
+
+
+def small_multiples_grid(panels, bar_name, line_name, y2_title, line=None, columns=2):
+    # panels is a list of (title, x, bar values, line values); each gets a
+    # count bar on its own y axis and a fine line on a secondary one
+    rows = max(math.ceil(len(panels) / columns), 1)
+    fig = make_subplots(
+        rows=rows,
+        cols=columns,
+        specs=[[{"secondary_y": True}] * columns for _ in range(rows)],
+        subplot_titles=[title for title, *_ in panels],
+        vertical_spacing=0.4 / rows,
+        horizontal_spacing=0.12,
+    )
+
+    for i, (_, x, bars, values) in enumerate(panels):
+        row, col = i // columns + 1, i % columns + 1
+        x = typed_array(x)
+        fig.add_trace(go.Bar(x=x, y=typed_array(bars), name=bar_name, marker_color='steelblue'), row=row, col=col)
+        fig.add_trace(
+            go.Scatter(x=x, y=typed_array(values), name=line_name, mode='lines+markers',
+                       line=line or dict(color='indianred')),
+            row=row, col=col, secondary_y=True,
+        )
+
+    fig.update_xaxes(dtick=1)
+    fig.update_xaxes(title_text='Year', row=rows)
+    fig.update_yaxes(title_text='Violation Count', col=1, secondary_y=False)
+    fig.update_yaxes(title_text=y2_title, col=columns, secondary_y=True)
+    fig.update_yaxes(showgrid=False, secondary_y=True)
+    fig.update_layout(
+        height=PANEL_HEIGHT * rows,
+        margin=dict(t=40, b=30, l=30, r=30),
+        showlegend=False,
+        template=TEMPLATE
+    )
+    return fig
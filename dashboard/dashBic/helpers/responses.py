@@ -0,0 +1,34 @@
+import os
+
+import plotly.io as pio
+from flask_compress import Compress
+
+# Responses under BIC_COMPRESS_MIN_BYTES go out as is: for the small callback
+# replies (cards, the takeaways text) compressing saves less than it costs
+COMPRESS_MIN_BYTES = int(os.environ.get("BIC_COMPRESS_MIN_BYTES", 1400))
+# Preference order when the browser accepts several, e.g. "br,gzip"
+COMPRESS_ALGORITHMS = [
+    algorithm.strip() for algorithm in os.environ.get("BIC_COMPRESS_ALGORITHMS", "br,gzip").split(",")
+    if algorithm.strip()
+]
+
+
+def use_fast_json():
+    # Dash serializes callback responses through plotly's to_json, which
+    # encodes numpy arrays and figures several times faster with orjson
+    try:
+        import orjson  # noqa: F401
+    except ImportError:
+        print("orjson is not installed; serializing responses with the standard json encoder")
+        return
+    pio.json.config.default_engine = "orjson"
+
+
+def compress_responses(server):
+    # Configured here rather than with dash.Dash(compress=True), which
+    # always restricts flask-compress to gzip
+    server.config.update(
+        COMPRESS_ALGORITHM=COMPRESS_ALGORITHMS,
+        COMPRESS_MIN_SIZE=COMPRESS_MIN_BYTES,
+    )
+    Compress(server)
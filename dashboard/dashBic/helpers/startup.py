@@ -0,0 +1,30 @@
+import os
+import time
+
+# Report how a worker's boot splits between imports, data load and layout
+PROFILE_STARTUP = os.environ.get("BIC_PROFILE_STARTUP") == "1"
+
+
+class StartupProfile:
+    # app.py imports this first, so the clock starts just before its other imports
+    def __init__(self, enabled=PROFILE_STARTUP):
+        self.enabled = enabled
+        self.phases = []
+        self._last = time.perf_counter()
+
+    def mark(self, name):
+        # Everything since the previous mark counts toward this phase
+        now = time.perf_counter()
+        self.phases.append((name, now - self._last))
+        self._last = now
+
+    def report(self):
+        if not self.enabled:
+            return
+        total = sum(seconds for _, seconds in self.phases)
+        print(f"dashBic startup in {os.getpid()}: {total * 1000:.0f} ms")
+        for name, seconds in self.phases:
+            print(f"   {name:<10} {seconds * 1000:8.1f} ms")
+
+
+startup = StartupProfile()
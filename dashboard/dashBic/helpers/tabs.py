@@ -0,0 +1,10 @@
+# Tab ids and labels, in the order the tab bar shows them. Kept apart from
+# app.py so the tools can name the tabs without loading the data.
+TABS = {
+    "overview": "Overview & Summary",
+    "trends": "Long Term Trends",
+    "violations": "Violation Categories",
+    "fine-violation relationships": "Fine-Violation Relationships",
+    "frequent violators": "Frequent Violators",
+    "takeaways": "Key Takeaways",
+}
@@ -1,3 +1,6 @@
+import re
+
+import numpy as np
 import pandas as pd
 
 # Dictionary of short labels for common violations
@@ -26,4 +29,33 @@ def get_short_label(description):
     for key, short in short_descriptions.items():
         if norm.startswith(key):
             return short
-    return description[:40] + '...' if isinstance(description, str) else "Unknown"
\ No newline at end of file
+    return description[:40] + '...' if isinstance(description, str) else "Unknown"
+
+# One anchored alternation in dict order, so the first matching key wins just like get_short_label
+_rule_prefixes = re.compile("|".join(re.escape(key) for key in short_descriptions))
+
+def classify_rules(descriptions):
+    # Label each distinct rule text once and broadcast the result back to the rows
+    codes, uniques = pd.factorize(descriptions)
+
+    labels = []
+    unmatched = []
+    for description in uniques:
+        match = _rule_prefixes.match(normalize_rule(description))
+        if match:
+            labels.append(short_descriptions[match.group(0)])
+        else:
+            labels.append(get_short_label(description))
+            unmatched.append(description)
+
+    # Missing descriptions factorize to -1; give them the trailing "Unknown" slot
+    labels.append("Unknown")
+    label_codes, categories = pd.factorize(pd.Index(labels))
+    row_codes = label_codes[np.where(codes < 0, len(uniques), codes)]
+
+    short_labels = pd.Series(
+        pd.Categorical.from_codes(row_codes, categories=categories),
+        index=descriptions.index,
+        name="ShortLabel"
+    )
+    return short_labels.cat.remove_unused_categories(), unmatched
@@ -1,94 +1,68 @@
-import pandas as pd
 import plotly.graph_objects as go
-import plotly.express as px
 import dash_bootstrap_components as dbc
 from dash import html, dcc
+from ..data.correlations import fine_count_correlations
+from ..data.cube import rollup
+from ..helpers.figures import TEMPLATE, small_multiples_grid, typed_array
 
-def render_fine_violation_tab(violations_df):
-    # --- Clean & Prepare Data ---
-    violations_df['Year'] = pd.to_datetime(violations_df['DATE VIOLATION ISSUED'], errors='coerce').dt.year
-    violations_df = violations_df[violations_df['Year'] >= 2015]
+def render_fine_violation_tab(cube, grid=False):
+    # plotly.express costs ~100 ms to import; only pay it once this tab is opened
+    import plotly.express as px
 
-    top10_labels = violations_df['ShortLabel'].value_counts().head(10).index
-
-    # --- Correlation Data ---
-    corr_df = (
-        violations_df[violations_df['ShortLabel'].isin(top10_labels)]
-        .dropna(subset=['FINE AMOUNT', 'Year'])
-        .groupby(['ShortLabel', 'Year'])
-        .agg(
-            TotalFines=('FINE AMOUNT', 'sum'),
-            ViolationCount=('FINE AMOUNT', 'count'),
-            AvgFine=('FINE AMOUNT', 'mean')
-        )
-        .reset_index()
+    # --- Prepare Data ---
+    top10_labels = (
+        rollup(cube, ['ShortLabel'])
+        .sort_values(by='Rows', ascending=False)
+        .head(10)['ShortLabel']
     )
 
-    corr_result = (
-        corr_df
-        .groupby('ShortLabel')[['AvgFine', 'ViolationCount']]
-        .corr()
-        .iloc[0::2, -1]
-        .reset_index()
-        .rename(columns={'ViolationCount': 'Correlation'})
-        .drop(columns=['level_1'])
-    )
+    corr_result, label_series = fine_count_correlations(rollup(cube, ['ShortLabel', 'Year']), top10_labels)
 
     # --- Correlation Chart ---
     fig_corr = px.bar(
-        corr_result.sort_values(by='Correlation'),
+        corr_result,
         x='Correlation',
         y='ShortLabel',
         orientation='h',
         color='Correlation',
         color_continuous_scale='RdBu',
-        title="Top 10 Violation Types: Correlation Between Avg Fine & Count"
+        title="Top 10 Violation Types: Correlation Between Avg Fine & Count",
+        template=TEMPLATE
     )
     fig_corr.update_layout(
         yaxis_title="Violation Type",
         xaxis_title="Correlation",
         height=500,
-        plot_bgcolor='#1e1e1e',
-        paper_bgcolor='#1e1e1e',
-        font_color='white'
-    )
-
-    # --- Time Series Data ---
-    sorted_labels = (
-        corr_result
-        .set_index('ShortLabel')
-        .loc[top10_labels]
-        .sort_values('Correlation')
-        .reset_index()
-    )
-
-    plot_df = (
-        violations_df[violations_df['ShortLabel'].isin(sorted_labels['ShortLabel'])]
-        .groupby(['ShortLabel', 'Year'])
-        .agg(
-            AvgFine=('FINE AMOUNT', 'mean'),
-            ViolationCount=('FINE AMOUNT', 'count')
-        )
-        .reset_index()
+        template=TEMPLATE
     )
 
     # --- Generate Small Multiples (Time Series Graphs) ---
+    if grid:
+        return render_layout(fig_corr, [dcc.Graph(figure=small_multiples_grid(
+            [(label, subset['Year'], subset['ViolationCount'], subset['AvgFine'])
+             for label, subset in label_series.items()],
+            bar_name='Violation Count',
+            line_name='Avg Fine ($)',
+            y2_title='Avg Fine ($)',
+            line=dict(color='indianred', dash='dot')
+        ))], md=12)
+
     time_series_graphs = []
-    for label in sorted_labels['ShortLabel']:
-        subset = plot_df[plot_df['ShortLabel'] == label]
+    for label, subset in label_series.items():
+        years = typed_array(subset['Year'])
         fig = go.Figure()
 
         fig.add_trace(go.Bar(
-            x=subset['Year'],
-            y=subset['ViolationCount'],
+            x=years,
+            y=typed_array(subset['ViolationCount']),
             name='Violation Count',
             marker_color='steelblue',
             yaxis='y1'
         ))
 
         fig.add_trace(go.Scatter(
-            x=subset['Year'],
-            y=subset['AvgFine'],
+            x=years,
+            y=typed_array(subset['AvgFine']),
             name='Avg Fine ($)',
             mode='lines+markers',
             line=dict(color='indianred', dash='dot'),
@@ -108,21 +82,21 @@ def render_fine_violation_tab(violations_df):
                 showgrid=False
             ),
             showlegend=False,
-            plot_bgcolor='#1e1e1e',
-            paper_bgcolor='#1e1e1e',
-            font_color='white'
+            template=TEMPLATE
         )
 
         time_series_graphs.append(dcc.Graph(figure=fig))
 
-    # --- Layout ---
+    return render_layout(fig_corr, time_series_graphs, md=6)
+
+def render_layout(fig_corr, time_series_graphs, md):
     return dbc.Container([
         html.H4("Fine-Violation Relationships", className="mb-4"),
         dcc.Graph(figure=fig_corr, className="mb-5"),
         html.Hr(className="mb-4"),
         html.H5("Yearly Trends for Top Violation Types", className="mb-3"),
         dbc.Row([
-            dbc.Col(time_series_graphs[i], md=6, className="mb-4")
+            dbc.Col(time_series_graphs[i], md=md, className="mb-4")
             for i in range(len(time_series_graphs))
         ])
     ], fluid=True, className="mt-4")
\ No newline at end of file
@@ -1,15 +1,19 @@
-import pandas as pd
 import plotly.graph_objects as go
 import dash_bootstrap_components as dbc
-from dash import html, dcc, Input, Output, callback
+from dash import html, dcc, Input, Output, State, ALL, ClientsideFunction
+from ..data.rankings import account_series, top_accounts
+from ..helpers.figures import TEMPLATE, small_multiples_grid, typed_array
 
-def render_frequent_violators_tab(violations_df):
+RANK_METRICS = ["TotalFines", "ViolationCount"]
+FINE_METRICS = {"TotalFines": "Total Fines ($)", "AverageFines": "Average Fine ($)"}
+
+def render_frequent_violators_tab(rankings, grid=False, k=10):
     return dbc.Container([
         html.H4("Frequent Violators", className="mb-4"),
 
         dbc.Row([
             dbc.Col([
-                html.Label("Show Top 10 Accounts by:"),
+                html.Label(f"Show Top {k} Accounts by:"),
                 dcc.RadioItems(
                     id="rank-toggle",
                     options=[
@@ -23,76 +27,95 @@ def render_frequent_violators_tab(violations_df):
             ])
         ], className="mb-3"),
 
-        html.Div(dcc.RadioItems(id="fine-metric-toggle", value="TotalFines"), style={"display": "none"}),
+        # Every toggle combination, so switching happens in the browser
+        dcc.Store(id="frequent-violators-data", data=frequent_violators_payload(rankings, grid, k)),
 
-        html.Div(id="frequent-violators-content")
+        html.Div(
+            render_frequent_violators_content(rankings, "TotalFines", "TotalFines", grid, k),
+            id="frequent-violators-content"
+        )
     ], fluid=True)
 
-@callback(
-    Output("frequent-violators-content", "children"),
-    Input("rank-toggle", "value"),
-    Input("fine-metric-toggle", "value"),
-    prevent_initial_call=False
-)
-def update_frequent_violators(rank_by, fine_metric):
-    # Load and clean data
-    violations_df = pd.read_csv("https://drive.google.com/uc?export=download&id=1SOaADySZRl_mHg--NA4M0ZiORSecljwI")
-    violations_df = violations_df.dropna(subset=['ACCOUNT NAME', 'FINE AMOUNT'])
-    violations_df['DATE VIOLATION ISSUED'] = pd.to_datetime(violations_df['DATE VIOLATION ISSUED'], errors='coerce')
-    violations_df['Year'] = violations_df['DATE VIOLATION ISSUED'].dt.year
-    violations_df = violations_df[violations_df['Year'] >= 2015]
-
-    # Rankings
-    account_summary = (
-        violations_df
-        .groupby('ACCOUNT NAME')
-        .agg(TotalFines=('FINE AMOUNT', 'sum'), ViolationCount=('FINE AMOUNT', 'count'))
-        .reset_index()
-    )
-    top_accounts = account_summary.sort_values(by=rank_by, ascending=False).head(10)['ACCOUNT NAME']
-    top10_data = violations_df[violations_df['ACCOUNT NAME'].isin(top_accounts)]
-    top10_summary = (
-        top10_data
-        .groupby('ACCOUNT NAME')
-        .agg(TotalFines=('FINE AMOUNT', 'sum'), ViolationCount=('FINE AMOUNT', 'count'))
-        .reset_index()
-        .sort_values(by=rank_by, ascending=False)
+def register_frequent_violators_callbacks(app):
+    # Restyles the figures already on the page from the stored payload
+    # (assets/frequentViolators.js); toggles never reach the server
+    app.clientside_callback(
+        ClientsideFunction(namespace="bic", function_name="switchFrequentViolators"),
+        Output("frequent-violators-top-violations", "children"),
+        Output("frequent-violators-pct-violations", "children"),
+        Output("frequent-violators-top-fines", "children"),
+        Output("frequent-violators-pct-fines", "children"),
+        Output("frequent-violators-main", "figure"),
+        Output({"type": "frequent-violators-series", "index": ALL}, "figure"),
+        Input("rank-toggle", "value"),
+        Input("fine-metric-toggle", "value"),
+        State("frequent-violators-data", "data"),
+        State("frequent-violators-main", "figure"),
+        State({"type": "frequent-violators-series", "index": ALL}, "figure"),
+        prevent_initial_call=True
     )
 
-    # Totals and %s
-    total_violations = violations_df.shape[0]
-    total_fines = violations_df['FINE AMOUNT'].sum()
-    top10_violations = top10_data.shape[0]
-    top10_fines = top10_data['FINE AMOUNT'].sum()
-    pct_violations = (top10_violations / total_violations) * 100
-    pct_fines = (top10_fines / total_fines) * 100
+def ranking_cards(rankings, rank_by, k):
+    top10_summary = top_accounts(rankings, rank_by, k)
+    top10_violations = top10_summary['ViolationCount'].sum()
+    top10_fines = top10_summary['TotalFines'].sum()
+    pct_violations = (top10_violations / rankings.total_violations) * 100
+    pct_fines = (top10_fines / rankings.total_fines) * 100
+    return [f"{top10_violations:,}", f"{pct_violations:.2f}%", f"${top10_fines:,.2f}", f"{pct_fines:.2f}%"]
+
+def frequent_violators_payload(rankings, grid, k):
+    ranks = {}
+    accounts = {}
+    for rank_by in RANK_METRICS:
+        top = top_accounts(rankings, rank_by, k)
+        ranks[rank_by] = {
+            "accounts": top['ACCOUNT NAME'].tolist(),
+            "TotalFines": top['TotalFines'].tolist(),
+            "ViolationCount": top['ViolationCount'].tolist(),
+            "cards": ranking_cards(rankings, rank_by, k),
+        }
+        accounts.update(dict.fromkeys(ranks[rank_by]["accounts"]))
+
+    series = {}
+    for account in accounts:
+        subset = account_series(rankings, account)
+        series[account] = {
+            column: subset[column].tolist()
+            for column in ["Year", "ViolationCount", *FINE_METRICS]
+        }
+    return {"grid": grid, "ranks": ranks, "series": series, "fine_titles": FINE_METRICS}
+
+def render_frequent_violators_content(rankings, rank_by, fine_metric, grid=False, k=10):
+    # Rankings
+    top10_summary = top_accounts(rankings, rank_by, k)
+    top_violations, pct_violations, top_fines, pct_fines = ranking_cards(rankings, rank_by, k)
 
     summary = dbc.Row([
         dbc.Col(dbc.Card([
-            dbc.CardHeader("Violations from Top 10"),
+            dbc.CardHeader(f"Violations from Top {k}"),
             dbc.CardBody([
-                html.H4(f"{top10_violations:,}", className="card-title"),
+                html.H4(top_violations, id="frequent-violators-top-violations", className="card-title"),
             ])
         ], color="dark", inverse=True), md=3),
 
         dbc.Col(dbc.Card([
             dbc.CardHeader("Percent of All Violations"),
             dbc.CardBody([
-                html.H4(f"{pct_violations:.2f}%", className="card-title"),
+                html.H4(pct_violations, id="frequent-violators-pct-violations", className="card-title"),
             ])
         ], color="dark", inverse=True), md=3),
 
         dbc.Col(dbc.Card([
-            dbc.CardHeader("Fines from Top 10"),
+            dbc.CardHeader(f"Fines from Top {k}"),
             dbc.CardBody([
-                html.H4(f"${top10_fines:,.2f}", className="card-title"),
+                html.H4(top_fines, id="frequent-violators-top-fines", className="card-title"),
             ])
         ], color="dark", inverse=True), md=3),
 
         dbc.Col(dbc.Card([
             dbc.CardHeader("Percent of All Fines"),
             dbc.CardBody([
-                html.H4(f"{pct_fines:.2f}%", className="card-title"),
+                html.H4(pct_fines, id="frequent-violators-pct-fines", className="card-title"),
             ])
         ], color="dark", inverse=True), md=3)
     ], className="mb-4")
@@ -103,7 +126,7 @@ def update_frequent_violators(rank_by, fine_metric):
     # Total Fines bar - left y-axis
     fig_main.add_trace(go.Bar(
         x=top10_summary['ACCOUNT NAME'],
-        y=top10_summary['TotalFines'],
+        y=typed_array(top10_summary['TotalFines']),
         name='Total Fines',
         marker_color='indianred',
         offsetgroup=0,
@@ -113,7 +136,7 @@ def update_frequent_violators(rank_by, fine_metric):
     # Violation Count bar - right y-axis
     fig_main.add_trace(go.Bar(
         x=top10_summary['ACCOUNT NAME'],
-        y=top10_summary['ViolationCount'],
+        y=typed_array(top10_summary['ViolationCount']),
         name='Violation Count',
         marker_color='steelblue',
         offsetgroup=1,
@@ -121,7 +144,7 @@ def update_frequent_violators(rank_by, fine_metric):
     ))
 
     fig_main.update_layout(
-        title="Top 10 Accounts by Total Fines & Violation Count",
+        title=f"Top {k} Accounts by Total Fines & Violation Count",
         xaxis=dict(title='Account Name', tickangle=-45),
         yaxis=dict(
             title='Total Fines ($)',
@@ -136,9 +159,7 @@ def update_frequent_violators(rank_by, fine_metric):
         ),
         barmode='group',  # crucial for side-by-side bars
         height=600,
-        plot_bgcolor='#1e1e1e',
-        paper_bgcolor='#1e1e1e',
-        font_color='white',
+        template=TEMPLATE,
         legend=dict(x=0.5, y=1.15, orientation='h', xanchor='center')
     )
 
@@ -160,64 +181,66 @@ def update_frequent_violators(rank_by, fine_metric):
     ], className="my-4")
 
     # Time Series Charts for Top Accounts
-    plot_df = (
-        top10_data
-        .groupby(['ACCOUNT NAME', 'Year'])
-        .agg(
-            TotalFines=('FINE AMOUNT', 'sum'),
-            ViolationCount=('FINE AMOUNT', 'count'),
-            AverageFines=('FINE AMOUNT', 'mean')
-        )
-        .reset_index()
-    )
-
-    time_series_charts = []
-    for account in top_accounts:
-        subset = plot_df[plot_df['ACCOUNT NAME'] == account]
-        fig = go.Figure()
-        fig.add_trace(go.Bar(
-            x=subset['Year'],
-            y=subset['ViolationCount'],
-            name='Violation Count',
-            marker_color='steelblue',
-            yaxis='y1'
-        ))
-        fig.add_trace(go.Scatter(
-            x=subset['Year'],
-            y=subset[fine_metric],
-            name=fine_metric,
-            mode='lines+markers',
-            line=dict(color='indianred'),
-            yaxis='y2'
-        ))
-        fig.update_layout(
-            title=account,
-            xaxis=dict(title='Year', dtick=1),
-            yaxis=dict(title='Violation Count', side='left'),
-            yaxis2=dict(
-                title='Total Fines ($)' if fine_metric == 'TotalFines' else 'Average Fine ($)',
-                overlaying='y',
-                side='right',
-                showgrid=False
-            ),
-            height=300,
-            margin=dict(t=40, b=30, l=30, r=30),
-            plot_bgcolor='#1e1e1e',
-            paper_bgcolor='#1e1e1e',
-            font_color='white',
-            showlegend=False
-        )
-        time_series_charts.append(dbc.Col(dcc.Graph(figure=fig), md=6))
+    fine_title = FINE_METRICS[fine_metric]
+    top_series = [(account, account_series(rankings, account)) for account in top10_summary['ACCOUNT NAME']]
+    if grid:
+        time_series = [dcc.Graph(id={"type": "frequent-violators-series", "index": 0}, figure=small_multiples_grid(
+            [(account, subset['Year'], subset['ViolationCount'], subset[fine_metric])
+             for account, subset in top_series],
+            bar_name='Violation Count',
+            line_name=fine_metric,
+            y2_title=fine_title
+        ))]
+    else:
+        time_series_charts = [
+            dbc.Col(dcc.Graph(
+                id={"type": "frequent-violators-series", "index": i},
+                figure=account_time_series(account, subset, fine_metric, fine_title)
+            ), md=6)
+            for i, (account, subset) in enumerate(top_series)
+        ]
+        time_series = [dbc.Row(time_series_charts[i:i + 2]) for i in range(0, len(time_series_charts), 2)]
 
     return html.Div([
         summary,
-        dcc.Graph(figure=fig_main),
+        dcc.Graph(id="frequent-violators-main", figure=fig_main),
         fine_toggle,
         html.Hr(),
         html.H5("Violations and Fines Over Time"),
-        dbc.Row(time_series_charts[:2]),
-        dbc.Row(time_series_charts[2:4]),
-        dbc.Row(time_series_charts[4:6]),
-        dbc.Row(time_series_charts[6:8]),
-        dbc.Row(time_series_charts[8:10]),
-    ])
\ No newline at end of file
+        *time_series
+    ])
+
+def account_time_series(account, subset, fine_metric, fine_title):
+    years = typed_array(subset['Year'])
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=years,
+        y=typed_array(subset['ViolationCount']),
+        name='Violation Count',
+        marker_color='steelblue',
+        yaxis='y1'
+    ))
+    fig.add_trace(go.Scatter(
+        x=years,
+        y=typed_array(subset[fine_metric]),
+        name=fine_metric,
+        mode='lines+markers',
+        line=dict(color='indianred'),
+        yaxis='y2'
+    ))
+    fig.update_layout(
+        title=account,
+        xaxis=dict(title='Year', dtick=1),
+        yaxis=dict(title='Violation Count', side='left'),
+        yaxis2=dict(
+            title=fine_title,
+            overlaying='y',
+            side='right',
+            showgrid=False
+        ),
+        height=300,
+        margin=dict(t=40, b=30, l=30, r=30),
+        template=TEMPLATE,
+        showlegend=False
+    )
+    return fig
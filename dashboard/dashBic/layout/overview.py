@@ -1,8 +1,9 @@
 from dash import html, dcc, Input, Output
 import dash_bootstrap_components as dbc
 from ..components.metrics import generate_metric_cards
+from ..data.summary import summarize
 
-def render_overview(df):
+def render_overview():
     return dbc.Container([
         html.H3("Overview & Key Questions"),
         html.Ul([
@@ -26,11 +27,11 @@ def render_overview(df):
         )
     ])
 
-def register_overview_callbacks(app, violations_df):
+def register_overview_callbacks(app, store, callback_cache):
     @app.callback(
         Output("summary-stats", "children"),
         Input("year-slider", "value")
     )
-    def update_summary(selected_years):
-        df = violations_df[violations_df['Year'].between(selected_years[0], selected_years[1])]
-        return generate_metric_cards(df)
\ No newline at end of file
+    @callback_cache.cached(store.get)
+    def update_summary(selected_years, data):
+        return generate_metric_cards(summarize(data.summary, selected_years[0], selected_years[1]))
\ No newline at end of file
@@ -1,42 +1,17 @@
 from dash import dcc, html
 import dash_bootstrap_components as dbc
 import plotly.graph_objects as go
-import pandas as pd
-
-def render_trends(complaints_df, violations_df):
-    # --- Data Preparation ---
-    yearly_counts = pd.DataFrame({
-        'Complaints': complaints_df.groupby('Year').size(),
-        'Violations': violations_df.groupby('Year').size()
-    }).reset_index()
-
-    avg_fine = (
-        violations_df.dropna(subset=['FINE AMOUNT', 'Year'])
-        .groupby('Year')
-        .agg(TotalFines=('FINE AMOUNT', 'sum'), NumViolations=('FINE AMOUNT', 'count'))
-        .assign(AverageFine=lambda df: df['TotalFines'] / df['NumViolations'])
-        .reset_index()
-    )
-
-    first_seen_years = (
-        violations_df.dropna(subset=['DESCRIPTION OF RULE', 'DATE VIOLATION ISSUED'])
-        .groupby('DESCRIPTION OF RULE')['DATE VIOLATION ISSUED']
-        .min().dt.year.value_counts().sort_index().reset_index()
-    )
-    first_seen_years.columns = ['Year', 'NewViolationTypes']
-    first_seen_years = first_seen_years[first_seen_years['Year'].between(2015, 2025)]
-    first_seen_years['CumulativeViolationTypes'] = first_seen_years['NewViolationTypes'].cumsum()
-
-    merged = pd.merge(yearly_counts, avg_fine[['Year', 'AverageFine']], on='Year', how='left')
-    merged = pd.merge(merged, first_seen_years[['Year', 'CumulativeViolationTypes']], on='Year', how='left')
+from ..helpers.figures import TEMPLATE, typed_array
 
+def render_trends(trends):
     # --- Figure 1: Trends ---
+    years = typed_array(trends['Year'])
     fig = go.Figure()
-    fig.add_trace(go.Scatter(x=merged['Year'], y=merged['Complaints'], mode='lines+markers', name='Complaints'))
-    fig.add_trace(go.Scatter(x=merged['Year'], y=merged['Violations'], mode='lines+markers', name='Violations'))
-    fig.add_trace(go.Scatter(x=merged['Year'], y=merged['AverageFine'], mode='lines+markers',
+    fig.add_trace(go.Scatter(x=years, y=typed_array(trends['Complaints']), mode='lines+markers', name='Complaints'))
+    fig.add_trace(go.Scatter(x=years, y=typed_array(trends['Violations']), mode='lines+markers', name='Violations'))
+    fig.add_trace(go.Scatter(x=years, y=typed_array(trends['AverageFine']), mode='lines+markers',
                              name='Average Fine ($)', yaxis='y2', line=dict(dash='dot')))
-    fig.add_trace(go.Bar(x=merged['Year'], y=merged['CumulativeViolationTypes'],
+    fig.add_trace(go.Bar(x=years, y=typed_array(trends['CumulativeViolationTypes']),
                          name='Cumulative Violation Types', marker_color='lightgray', opacity=0.5))
 
     fig.update_layout(
@@ -45,35 +20,22 @@ def render_trends(complaints_df, violations_df):
         yaxis2=dict(title='Average Fine ($)', overlaying='y', side='right'),
         legend=dict(x=0.5, xanchor='center', y=1.15, orientation='h'),
         height=600,
-        plot_bgcolor='#1e1e1e',
-        paper_bgcolor='#1e1e1e',
-        font_color='white'
+        template=TEMPLATE
     )
 
     # --- Figure 2: New Violation Types ---
-    new_violations_df = (
-        violations_df.dropna(subset=['DESCRIPTION OF RULE', 'DATE VIOLATION ISSUED'])
-        .groupby('DESCRIPTION OF RULE')['DATE VIOLATION ISSUED']
-        .min()
-        .dt.year
-        .value_counts()
-        .sort_index()
-        .reset_index()
-    )
-    new_violations_df.columns = ['Year', 'NewViolationTypes']
-    new_violations_df = new_violations_df[new_violations_df['Year'].between(2015, 2025)]
-    new_violations_df['Cumulative'] = new_violations_df['NewViolationTypes'].cumsum()
+    new_violations_df = trends[trends['NewViolationTypes'] > 0]
 
     new_types_fig = go.Figure()
     new_types_fig.add_trace(go.Bar(
-        x=new_violations_df['Year'],
-        y=new_violations_df['NewViolationTypes'],
+        x=typed_array(new_violations_df['Year']),
+        y=typed_array(new_violations_df['NewViolationTypes']),
         name='New Violation Types',
         marker_color='indianred'
     ))
     new_types_fig.add_trace(go.Scatter(
-        x=new_violations_df['Year'],
-        y=new_violations_df['Cumulative'],
+        x=typed_array(new_violations_df['Year']),
+        y=typed_array(new_violations_df['CumulativeViolationTypes']),
         name='Cumulative Total',
         mode='lines+markers',
         line=dict(color='steelblue', dash='dot')
@@ -86,9 +48,7 @@ def render_trends(complaints_df, violations_df):
         xaxis=dict(dtick=1),
         legend=dict(x=0.5, xanchor='center', y=1.15, orientation='h'),
         height=500,
-        plot_bgcolor='#1e1e1e',
-        paper_bgcolor='#1e1e1e',
-        font_color='white'
+        template=TEMPLATE
     )
 
     # --- Combine Both Charts with Consistent Bootstrap Layout ---
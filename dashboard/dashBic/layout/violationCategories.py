@@ -1,43 +1,35 @@
 import pandas as pd
-import plotly.express as px
 import plotly.graph_objects as go
 import dash_bootstrap_components as dbc
 from dash import html, dcc
+from ..data.aggregates import fine_box_stats, fine_median
+from ..data.cube import rollup, totals
+from ..helpers.figures import TEMPLATE, typed_array
 
-def render_violation_categories(violations_df):
-    # --- Top 10 Violation Types ---
-    top_labels = violations_df['ShortLabel'].value_counts().head(10).index.tolist()
-    filtered = violations_df[violations_df['ShortLabel'].isin(top_labels)].dropna(subset=['ShortLabel'])
-
-    # --- Summary Stats ---
-    stats = (
-        filtered.groupby('ShortLabel')['FINE AMOUNT']
-        .agg(['mean', 'median', 'min', 'max'])
-        .reset_index()
-        .rename(columns={'mean': 'AvgFine', 'median': 'MedianFine', 'min': 'MinFine', 'max': 'MaxFine'})
-    )
-
-    counts = (
-        filtered['ShortLabel'].value_counts()
-        .rename_axis('ShortLabel')
-        .reset_index(name='Count')
-    )
-
-    descriptions = filtered.drop_duplicates(subset='ShortLabel')[['ShortLabel', 'DESCRIPTION OF RULE']]
+def render_violation_categories(cube, fine_counts):
+    # plotly.express costs ~100 ms to import; only pay it once this tab is opened
+    import plotly.express as px
 
+    # --- Top 10 Violation Types ---
+    by_label = rollup(cube, ['ShortLabel'])
     top_types = (
-        counts.merge(stats, on='ShortLabel')
-              .merge(descriptions, on='ShortLabel')
-              .sort_values(by="Count", ascending=False)
+        by_label.rename(columns={'Count': 'FineCount', 'Rows': 'Count'})
+        .sort_values(by="Count", ascending=False)
+        .head(10)
     )
+    top_labels = top_types['ShortLabel'].tolist()
+
+    # Medians and the box plot come from the count of each fine amount
+    filtered = fine_counts[fine_counts['ShortLabel'].isin(top_labels)]
+    filtered = filtered.assign(ShortLabel=filtered['ShortLabel'].astype(str))
 
     # --- Global Percent Metrics ---
-    all_violations = violations_df.shape[0]
-    all_fines = violations_df['FINE AMOUNT'].sum()
+    overall = totals(cube)
+    all_violations = overall['Rows']
+    all_fines = overall['TotalFines']
 
-    top10_data = violations_df[violations_df['ShortLabel'].isin(top_types['ShortLabel'])]
-    top10_violations = top10_data.shape[0]
-    top10_fines = top10_data['FINE AMOUNT'].sum()
+    top10_violations = int(top_types['Count'].sum())
+    top10_fines = top_types['TotalFines'].sum()
 
     pct_violations = (top10_violations / all_violations) * 100
     pct_fines = (top10_fines / all_fines) * 100
@@ -51,34 +43,51 @@ def render_violation_categories(violations_df):
         title="Top 10 Violation Types",
         hover_data={'AvgFine': ':.2f'},
         labels={'Count': 'Violation Count', 'AvgFine': 'Avg Fine ($)'},
-        color_discrete_sequence=['steelblue']
+        color_discrete_sequence=['steelblue'],
+        template=TEMPLATE
     )
+    # px keeps the frame's column; send it as the same typed buffer as the other figures
+    fig_vio.update_traces(x=typed_array(top_types['Count']))
     fig_vio.update_layout(
         yaxis_title="Violation Type",
         xaxis_title="Number of Violations",
         height=500,
-        plot_bgcolor='#1e1e1e',
-        paper_bgcolor='#1e1e1e',
-        font_color='white'
+        template=TEMPLATE
     )
 
     # --- Box Plot (Fine Distribution) ---
-    summary_stats = (
-        filtered.groupby('ShortLabel')['FINE AMOUNT']
-        .agg(Min='min', Median='median', Max='max')
+    # Quartiles and whisker ends are computed here in one grouped pass,
+    # so each box ships a handful of numbers instead of every fine
+    positive = filtered[filtered['FINE AMOUNT'] > 0]
+    box_stats = (
+        positive.groupby('ShortLabel')[['FINE AMOUNT', 'Rows']]
+        .apply(fine_box_stats)
         .reset_index()
     )
+    summary_stats = (
+        top_types[['ShortLabel', 'MinFine', 'MaxFine']]
+        .rename(columns={'MinFine': 'Min', 'MaxFine': 'Max'})
+        .merge(
+            filtered.groupby('ShortLabel')[['FINE AMOUNT', 'Rows']].apply(fine_median).rename('Median').reset_index(),
+            on='ShortLabel'
+        )
+        .merge(box_stats, on='ShortLabel')
+        .sort_values(by='ShortLabel')
+    )
 
     fig_box = go.Figure()
-    for _, row in summary_stats.iterrows():
-        fines = filtered[filtered['ShortLabel'] == row['ShortLabel']]['FINE AMOUNT']
-        fines = fines[fines > 0]
+    for row in summary_stats.itertuples(index=False):
         fig_box.add_trace(go.Box(
-            y=fines,
-            name=row['ShortLabel'],
+            x=[row.ShortLabel],
+            q1=[row.q1],
+            median=[row.median],
+            q3=[row.q3],
+            lowerfence=[row.lowerfence],
+            upperfence=[row.upperfence],
+            name=row.ShortLabel,
             boxpoints=False,
             marker_color='indianred',
-            customdata=[[row['Min'], row['Median'], row['Max']]] * len(fines),
+            customdata=[[row.Min, row.Median, row.Max]],
             hovertemplate=(
                 "Min: $%{customdata[0]:,.0f}<br>"
                 "Median: $%{customdata[1]:,.0f}<br>"
@@ -93,9 +102,7 @@ def render_violation_categories(violations_df):
         xaxis_tickangle=-30,
         showlegend=False,
         height=550,
-        plot_bgcolor='#1e1e1e',
-        paper_bgcolor='#1e1e1e',
-        font_color='white'
+        template=TEMPLATE
     )
 
     # --- Render Layout ---
@@ -0,0 +1,284 @@
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import platform
+import re
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import dash
+from dash import html
+from plotly.io.json import to_json_plotly
+
+from ..data.loadData import read_and_prepare, read_and_prepare_streaming
+from ..data.store import DataStore, dataset_from_frames
+from ..helpers.cache import CallbackCache
+from ..layout.fineViolationRelationships import render_fine_violation_tab
+from ..layout.frequentViolators import render_frequent_violators_content, render_frequent_violators_tab
+from ..layout.overview import register_overview_callbacks, render_overview
+from ..layout.takeaways import render_key_takeaways_tab
+from ..layout.trends import render_trends
+from ..layout.violationCategories import render_violation_categories
+from .deployment import CALLBACK_ROUTE, summary_body
+from .syntheticData import SIZES, parse_size, write_sources
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "benchmarkBaseline.json")
+# Above this many rows the violations are streamed (BIC_CHUNK_ROWS), as a
+# deployment of that size would be; the full frame doesn't fit in memory
+STREAM_ABOVE = 2_000_000
+STREAM_CHUNK_ROWS = 1_000_000
+METRICS = ["seconds", "peak_bytes", "response_bytes"]
+# Timings and memory only mean something against a baseline from the same
+# host; response sizes don't depend on it, so any machine's baseline checks them
+PORTABLE_METRICS = ["response_bytes"]
+# Changes smaller than these are noise however large the ratio
+NOISE_FLOORS = {"seconds": 0.005, "peak_bytes": 2 * 1024 ** 2, "response_bytes": 256}
+
+
+def read_peak_rss():
+    with open("/proc/self/status") as f:
+        return int(re.search(r"VmHWM:\s+(\d+)", f.read()).group(1)) * 1024
+
+
+def reset_peak_rss():
+    # Linux resets VmHWM to the current RSS, so the next read is this call's peak
+    with open("/proc/self/clear_refs", "w") as f:
+        f.write("5")
+    with open("/proc/self/status") as f:
+        return int(re.search(r"VmRSS:\s+(\d+)", f.read()).group(1)) * 1024
+
+
+def rss_supported():
+    try:
+        reset_peak_rss()
+        read_peak_rss()
+    except (OSError, AttributeError):
+        return False
+    return True
+
+
+def measure(run, repeat, use_rss=False):
+    # Best wall time of `repeat` runs plus peak memory. With use_rss that is
+    # the growth of the RSS high-water mark during the first run, which also
+    # sees Arrow's buffers (Linux only); otherwise the peak of the Python and
+    # NumPy allocations traced during one extra run.
+    seconds = float("inf")
+    peak = None
+    for _ in range(repeat):
+        gc.collect()
+        before = reset_peak_rss() if use_rss and peak is None else None
+        start = time.perf_counter()
+        result = run()
+        seconds = min(seconds, time.perf_counter() - start)
+        if before is not None:
+            peak = read_peak_rss() - before
+
+    if peak is None:
+        gc.collect()
+        tracemalloc.start()
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return result, {"seconds": seconds, "peak_bytes": peak}
+
+
+def response_bytes(result):
+    if hasattr(result, "get_data"):
+        return len(result.get_data())
+    return len(to_json_plotly(result))
+
+
+def summary_client(dataset):
+    # update_summary registered on a bare app, so the timing covers the
+    # whole Dash request the browser makes (without the shared cache)
+    app = dash.Dash(__name__, suppress_callback_exceptions=True)
+    app.layout = html.Div()
+    store = DataStore()
+    store.publish(dataset)
+    register_overview_callbacks(app, store, CallbackCache(max_bytes=0))
+    client = app.server.test_client()
+    client.get("/")
+    return client
+
+
+def post_summary(client, years):
+    response = client.post(CALLBACK_ROUTE, json=summary_body(years))
+    if response.status_code != 200:
+        raise RuntimeError(f"update_summary returned {response.status_code}")
+    return response
+
+
+def callback_cases(dataset):
+    client = summary_client(dataset)
+    return {
+        "render_overview": render_overview,
+        "render_trends": lambda: render_trends(dataset.trends),
+        "render_violation_categories": lambda: render_violation_categories(dataset.cube, dataset.fine_counts),
+        "render_fine_violation_tab": lambda: render_fine_violation_tab(dataset.cube),
+        "render_fine_violation_tab[grid]": lambda: render_fine_violation_tab(dataset.cube, grid=True),
+        "render_frequent_violators_tab": lambda: render_frequent_violators_tab(dataset.rankings),
+        "render_frequent_violators_tab[grid]": lambda: render_frequent_violators_tab(dataset.rankings, grid=True),
+        # What the toggles showed before they moved to the browser
+        "render_frequent_violators_content": lambda: render_frequent_violators_content(
+            dataset.rankings, "ViolationCount", "AverageFines"
+        ),
+        "render_key_takeaways_tab": render_key_takeaways_tab,
+        "update_summary": lambda: post_summary(client, [2015, 2025]),
+        "update_summary[2018-2020]": lambda: post_summary(client, [2018, 2020]),
+    }
+
+
+def run_size(rows, data_dir, repeat, use_rss, chunk_rows):
+    sources = write_sources(data_dir, rows)
+    results = {}
+
+    # Preparation is timed once: at 10M rows a run takes minutes. Callbacks
+    # allocate far less than the pages preparation leaves resident, so their
+    # peaks are always traced.
+    streaming = rows > STREAM_ABOVE
+    with contextlib.redirect_stdout(io.StringIO()):
+        if streaming:
+            frames, results["prepare"] = measure(
+                lambda: read_and_prepare_streaming(sources, chunk_rows=chunk_rows), 1, use_rss
+            )
+        else:
+            frames, results["prepare"] = measure(lambda: read_and_prepare(sources), 1, use_rss)
+    dataset, results["build_dataset"] = measure(lambda: dataset_from_frames("benchmark", frames), 1, use_rss)
+    del frames
+
+    for name, run in callback_cases(dataset).items():
+        result, stats = measure(run, repeat)
+        stats["response_bytes"] = response_bytes(result)
+        results[name] = stats
+    return results
+
+
+def machine_key():
+    return f"{platform.node()} ({platform.machine()}, {os.cpu_count()} CPUs, python {platform.python_version()})"
+
+
+def read_baselines(path):
+    # {machine: {"memory": ..., "results": {size: {case: stats}}}}
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f).get("machines", {})
+
+
+def pick_baseline(baselines, machine):
+    # Returns (results, metrics to compare, where they came from)
+    if machine in baselines:
+        return baselines[machine]["results"], METRICS, machine
+    if baselines:
+        other, stored = next(iter(baselines.items()))
+        return stored["results"], PORTABLE_METRICS, other
+    return {}, [], None
+
+
+def compare(results, baseline, thresholds, metrics=METRICS):
+    # Returns the (size, case, metric, baseline, current) rows that regressed
+    regressions = []
+    for size, cases in results.items():
+        for case, stats in cases.items():
+            reference = baseline.get(size, {}).get(case, {})
+            for metric in metrics:
+                current, previous = stats.get(metric), reference.get(metric)
+                if current is None or previous is None:
+                    continue
+                if current - previous > max(previous * thresholds[metric], NOISE_FLOORS[metric]):
+                    regressions.append((size, case, metric, previous, current))
+    return regressions
+
+
+def change(current, previous):
+    if previous is None:
+        return ""
+    if previous == 0:
+        return "   new" if current else ""
+    return f"{(current - previous) / previous * 100:+6.0f}%"
+
+
+def print_results(results, baseline, metrics=METRICS):
+    print(f"{'size':<5} {'case':<38} {'ms':>10} {'':>7} {'peak MB':>9} {'':>7} {'bytes':>10} {'':>7}")
+    for size, cases in results.items():
+        for case, stats in cases.items():
+            # Changes are only shown for metrics comparable with the baseline
+            reference = {
+                metric: value for metric, value in baseline.get(size, {}).get(case, {}).items() if metric in metrics
+            }
+            response = stats.get("response_bytes")
+            print(
+                f"{size:<5} {case:<38} {stats['seconds'] * 1000:>10.1f} "
+                f"{change(stats['seconds'], reference.get('seconds')):>7} "
+                f"{stats['peak_bytes'] / 1024 ** 2:>9.1f} "
+                f"{change(stats['peak_bytes'], reference.get('peak_bytes')):>7} "
+                f"{'' if response is None else f'{response:,}':>10} "
+                f"{'' if response is None else change(response, reference.get('response_bytes')):>7}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="dashBic preparation and callback benchmarks on synthetic data")
+    parser.add_argument("--sizes", nargs="+", default=list(SIZES),
+                        help=f"violation rows per run: numbers or {', '.join(SIZES)}")
+    parser.add_argument("--data-dir", default=os.path.join(tempfile.gettempdir(), "bic-benchmark"),
+                        help="where the synthetic exports are written (and reused)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--chunk-rows", type=int, default=STREAM_CHUNK_ROWS)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="store these results as this machine's baseline instead of comparing")
+    parser.add_argument("--time-threshold", type=float, default=0.25)
+    parser.add_argument("--memory-threshold", type=float, default=0.2)
+    parser.add_argument("--bytes-threshold", type=float, default=0.05)
+    args = parser.parse_args()
+
+    use_rss = rss_supported()
+    results = {}
+    for size in args.sizes:
+        print(f"Running {size} ({parse_size(size):,} violation rows)...", file=sys.stderr)
+        results[size] = run_size(parse_size(size), args.data_dir, args.repeat, use_rss, args.chunk_rows)
+
+    machine = machine_key()
+    baselines = read_baselines(args.baseline)
+
+    if args.save_baseline:
+        print_results(results, {})
+        stored = baselines.setdefault(machine, {"results": {}})
+        stored["memory"] = "rss" if use_rss else "tracemalloc"
+        stored["results"].update(results)
+        with open(args.baseline, "w") as f:
+            json.dump({"machines": baselines}, f, indent=2)
+        print(f"Baseline for {machine} written to {args.baseline}")
+        return
+
+    baseline, metrics, source = pick_baseline(baselines, machine)
+    if source == machine and baselines[machine].get("memory") != ("rss" if use_rss else "tracemalloc"):
+        metrics = [metric for metric in metrics if metric != "peak_bytes"]
+    print_results(results, baseline, metrics)
+    if source is None:
+        print(f"No baseline at {args.baseline}; run with --save-baseline first")
+        return
+    if source != machine:
+        print(f"No baseline saved on {machine}; only response sizes are checked, against {source}. "
+              f"Run with --save-baseline here first to check timings and memory.")
+
+    regressions = compare(results, baseline, {
+        "seconds": args.time_threshold,
+        "peak_bytes": args.memory_threshold,
+        "response_bytes": args.bytes_threshold,
+    }, metrics)
+    for size, case, metric, previous, current in regressions:
+        print(f"REGRESSION {size} {case} {metric}: {previous:,.4g} -> {current:,.4g}")
+    if regressions:
+        sys.exit(1)
+    print("No regressions against the baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+import json
+import os
+
+APP_MODULE = "dashboard.dashBic.app"
+CALLBACK_ROUTE = "/_dash-update-component"
+YEARS = (2015, 2025)
+
+# Each worker drops a marker once the app (and its data) is loaded
+GUNICORN_CONFIG = """
+import os
+
+def post_worker_init(worker):
+{warm_up}    open(os.path.join({ready_dir!r}, str(worker.pid)), "w").close()
+"""
+# Renders every tab straight through render_tab, outside the callbacks, so
+# lazy imports and plotly's first-use setup are paid before the marker
+# without filling the render or callback caches
+WARM_UP = """    from {app_module} import TABS, render_tab, store
+    for tab in TABS:
+        render_tab(tab, store.get())
+"""
+
+
+def write_gunicorn_config(ready_dir, warm_up=False):
+    path = os.path.join(ready_dir, "gunicorn_conf.py")
+    with open(path, "w") as f:
+        f.write(GUNICORN_CONFIG.format(
+            ready_dir=ready_dir, warm_up=WARM_UP.format(app_module=APP_MODULE) if warm_up else "",
+        ))
+    return path
+
+
+def callback_body(output, inputs):
+    # What Dash's renderer posts when the first input changes
+    component_id, prop = output.split(".")
+    return {
+        "output": output,
+        "outputs": {"id": component_id, "property": prop},
+        "inputs": inputs,
+        "changedPropIds": [f"{inputs[0]['id']}.{inputs[0]['property']}"],
+    }
+
+
+def tab_body(tab):
+    return callback_body("tab-content.children", [{"id": "tabs", "property": "active_tab", "value": tab}])
+
+
+def summary_body(years=YEARS):
+    return callback_body("summary-stats.children", [{"id": "year-slider", "property": "value", "value": list(years)}])
+
+
+def encode(body):
+    return json.dumps(body).encode()
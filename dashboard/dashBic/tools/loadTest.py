@@ -0,0 +1,255 @@
+import argparse
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+
+from .deployment import APP_MODULE, CALLBACK_ROUTE, YEARS, encode, summary_body, tab_body, write_gunicorn_config
+from .syntheticData import parse_size, write_sources
+
+# How often a session opens each tab; overview is where everyone lands
+TAB_WEIGHTS = {
+    "overview": 3,
+    "trends": 2,
+    "violations": 2,
+    "fine-violation relationships": 2,
+    "frequent violators": 2,
+    "takeaways": 1,
+}
+# The slider updates on mouseup, so a drag is one request per release
+MAX_DRAGS = 4
+DEFAULT_CONFIGS = ["1x1:sync", "2x1:sync", "1x4:gthread", "2x4:gthread"]
+
+
+def parse_config(config):
+    # "WORKERSxTHREADS[:CLASS]", e.g. "2x4:gthread"; the class defaults to
+    # what gunicorn picks itself (gthread once there is more than one thread)
+    shape, _, worker_class = config.partition(":")
+    workers, _, threads = shape.partition("x")
+    threads = int(threads or 1)
+    return {
+        "name": config,
+        "workers": int(workers),
+        "threads": threads,
+        "worker_class": worker_class or ("gthread" if threads > 1 else "sync"),
+    }
+
+
+def slider_drags(rng):
+    # Each release moves one handle from where the last drag left it
+    low, high = YEARS
+    for _ in range(rng.randint(1, MAX_DRAGS)):
+        if rng.random() < 0.5:
+            low = rng.randint(YEARS[0], high)
+        else:
+            high = rng.randint(low, YEARS[1])
+        yield "update_summary", encode(summary_body((low, high)))
+
+
+def session(rng):
+    # What one visitor sends: the page's layout, then a few tab switches,
+    # dragging the year slider whenever they are on the overview. The
+    # frequent-violators toggles are clientside and never reach the server.
+    yield "layout", None
+    tabs = rng.choices(list(TAB_WEIGHTS), weights=list(TAB_WEIGHTS.values()), k=rng.randint(2, 6))
+    for tab in ["overview", *tabs]:
+        yield f"tab:{tab}", encode(tab_body(tab))
+        if tab == "overview":
+            yield from slider_drags(rng)
+
+
+def send(base_url, body, timeout):
+    # Returns (seconds, ok); the browser's Accept-Encoding keeps the
+    # compression cost in the measurement
+    if body is None:
+        request = urllib.request.Request(f"{base_url}/_dash-layout")
+    else:
+        request = urllib.request.Request(f"{base_url}{CALLBACK_ROUTE}", data=body, headers={
+            "Content-Type": "application/json",
+        })
+    request.add_header("Accept-Encoding", "br, gzip")
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+            ok = response.status == 200
+    except (urllib.error.URLError, OSError):
+        ok = False
+    return time.perf_counter() - start, ok
+
+
+def warm_up(base_url, workers, timeout):
+    # Dash's own first-request setup (layout and dependency routes), which
+    # no cache serves
+    for _ in range(workers * 2):
+        send(base_url, None, timeout)
+        with urllib.request.urlopen(f"{base_url}/_dash-dependencies", timeout=timeout) as response:
+            response.read()
+
+
+def run_users(base_url, users, duration, timeout, seed):
+    # `users` visitors replaying sessions back to back without think time
+    samples = [[] for _ in range(users)]
+    deadline = time.perf_counter() + duration
+
+    def user(index):
+        rng = random.Random(seed + index)
+        while time.perf_counter() < deadline:
+            for name, body in session(rng):
+                if time.perf_counter() >= deadline:
+                    return
+                seconds, ok = send(base_url, body, timeout)
+                samples[index].append((name, seconds, ok))
+
+    threads = [threading.Thread(target=user, args=(i,)) for i in range(users)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return [sample for user_samples in samples for sample in user_samples], time.perf_counter() - start
+
+
+def start_server(config, port, env, ready_dir, timeout):
+    # Workers warm up by rendering every tab outside the callbacks, so
+    # timing starts with imports paid but nothing cached
+    config_path = write_gunicorn_config(ready_dir, warm_up=True)
+
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", config_path,
+         "-w", str(config["workers"]), "--threads", str(config["threads"]), "-k", config["worker_class"],
+         "-b", f"127.0.0.1:{port}", "--timeout", str(int(timeout)), f"{APP_MODULE}:server"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.time() + timeout
+    while sum(name.isdigit() for name in os.listdir(ready_dir)) < config["workers"]:
+        if server.poll() is not None or time.time() > deadline:
+            server.terminate()
+            server.wait()
+            raise RuntimeError(f"gunicorn did not start {config['name']}")
+        time.sleep(0.1)
+    return server
+
+
+def percentile(values, q):
+    # Nearest rank on sorted values
+    return values[min(len(values) - 1, max(0, int(round(q / 100 * len(values))) - 1))]
+
+
+def summarize(samples, elapsed):
+    by_name = defaultdict(list)
+    errors = defaultdict(int)
+    for name, seconds, ok in samples:
+        by_name[name].append(seconds)
+        by_name["all"].append(seconds)
+        if not ok:
+            errors[name] += 1
+            errors["all"] += 1
+
+    stats = {}
+    for name, values in sorted(by_name.items()):
+        values.sort()
+        stats[name] = {
+            "requests": len(values),
+            "errors": errors[name],
+            "per_second": len(values) / elapsed,
+            "p50": percentile(values, 50),
+            "p95": percentile(values, 95),
+            "p99": percentile(values, 99),
+        }
+    return stats
+
+
+def print_stats(config, stats):
+    print(f"\n{config['name']} ({config['workers']} workers x {config['threads']} threads, "
+          f"{config['worker_class']})")
+    print(f"  {'request':<36} {'count':>7} {'errors':>6} {'req/s':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for name, row in stats.items():
+        print(f"  {name:<36} {row['requests']:>7} {row['errors']:>6} {row['per_second']:>7.1f} "
+              f"{row['p50'] * 1000:>8.1f} {row['p95'] * 1000:>8.1f} {row['p99'] * 1000:>8.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay Dash callback traffic against local gunicorn deployments")
+    parser.add_argument("--configs", nargs="+", default=DEFAULT_CONFIGS,
+                        help="WORKERSxTHREADS[:CLASS] per deployment, e.g. 2x4:gthread")
+    parser.add_argument("--users", type=int, default=8, help="concurrent sessions")
+    parser.add_argument("--duration", type=float, default=30, help="seconds of traffic per deployment")
+    parser.add_argument("--rows", default="10k", help="violation rows in the fixture: a number or 10k, 1m, 10m")
+    parser.add_argument("--data-dir", default=os.path.join(tempfile.gettempdir(), "bic-loadtest"),
+                        help="where the fixture and its snapshot are written (and reused)")
+    parser.add_argument("--no-callback-cache", action="store_true",
+                        help="turn off the SQLite callback cache shared by the workers")
+    parser.add_argument("--no-render-cache", action="store_true",
+                        help="turn off each worker's in-memory tab cache; with --no-callback-cache "
+                             "every request renders")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--port", type=int, default=8767)
+    parser.add_argument("--timeout", type=float, default=300)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    rows = parse_size(args.rows)
+    sources = write_sources(args.data_dir, rows)
+    env = dict(
+        os.environ,
+        BIC_COMPLAINTS_SOURCE=sources["complaints"],
+        BIC_VIOLATIONS_SOURCE=sources["violations"],
+        BIC_SNAPSHOT_DIR=os.path.join(args.data_dir, f"snapshot_{rows}"),
+        BIC_REFRESH_INTERVAL="0",
+    )
+    if args.no_callback_cache:
+        env["BIC_CALLBACK_CACHE_MB"] = "0"
+    if args.no_render_cache:
+        env["BIC_RENDER_CACHE_MB"] = "0"
+    caches = ", ".join(
+        f"{name} cache {'off' if off else 'on'}"
+        for name, off in (("callback", args.no_callback_cache), ("render", args.no_render_cache))
+    )
+
+    # Build the snapshot once so no deployment's workers parse the CSVs
+    subprocess.run(
+        [sys.executable, "-c", "from dashboard.dashBic.data.loadData import load_data; load_data()"],
+        env=env, check=True, stdout=subprocess.DEVNULL,
+    )
+
+    base_url = f"http://127.0.0.1:{args.port}"
+    results = {}
+    for config in map(parse_config, args.configs):
+        ready_dir = tempfile.mkdtemp(prefix="bic-loadtest-")
+        # A fresh shared cache per deployment, so none starts warm from the last
+        config_env = dict(env, BIC_CALLBACK_CACHE_PATH=os.path.join(ready_dir, "callbacks.sqlite3"))
+        server = start_server(config, args.port, config_env, ready_dir, args.timeout)
+        try:
+            warm_up(base_url, config["workers"], args.timeout)
+            samples, elapsed = run_users(base_url, args.users, args.duration, args.timeout, args.seed)
+        finally:
+            server.terminate()
+            server.wait()
+            shutil.rmtree(ready_dir, ignore_errors=True)
+        results[config["name"]] = summarize(samples, elapsed)
+        print_stats(config, results[config["name"]])
+
+    print(f"\n{'deployment':<16} {'req/s':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>6}"
+          f"  ({args.users} users, {rows:,} rows, {caches})")
+    for name, stats in results.items():
+        row = stats["all"]
+        print(f"{name:<16} {row['per_second']:>7.1f} {row['p50'] * 1000:>8.1f} "
+              f"{row['p95'] * 1000:>8.1f} {row['p99'] * 1000:>8.1f} {row['errors']:>6}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"users": args.users, "rows": rows, "duration": args.duration, "caches": caches,
+                       "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
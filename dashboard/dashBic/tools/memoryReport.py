@@ -0,0 +1,41 @@
+import argparse
+import json
+
+from ..data.loadData import COMPLAINTS_SOURCE, VIOLATIONS_SOURCE, read_source
+from ..data.memoryReport import format_report, frame_report, memory_report
+
+
+def raw_reports():
+    # The exports as pandas infers them, for comparison with the prepared
+    # frames; the app itself never keeps these around
+    sources = {"complaints": COMPLAINTS_SOURCE, "violations": VIOLATIONS_SOURCE}
+    return [frame_report(name, read_source(source, None)) for name, source in sources.items()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Deep memory usage of the frames, caches and tab renders of dashBic")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    parser.add_argument("--summary", action="store_true", help="leave out the per-column breakdown")
+    parser.add_argument("--no-tabs", action="store_true", help="skip rendering each tab")
+    parser.add_argument("--raw", action="store_true", help="also read the sources with inferred dtypes")
+    args = parser.parse_args()
+
+    from ..app import TABS, callback_cache, render_cache, render_tab, store
+
+    report = memory_report(
+        store.get(),
+        caches={"render": render_cache, "callbacks": callback_cache},
+        render=render_tab,
+        tabs=() if args.no_tabs else list(TABS),
+    )
+    if args.raw:
+        report["raw"] = raw_reports()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(format_report(report, columns=not args.summary))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+import argparse
+import time
+
+from ..helpers.tabs import TABS
+from .deployment import CALLBACK_ROUTE, summary_body, tab_body
+
+ENCODINGS = ["identity", "gzip", "br"]
+
+
+def requests():
+    for tab in TABS:
+        yield tab, tab_body(tab)
+    yield "summary", summary_body((2016, 2020))
+
+
+def measure(client, body, encoding, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        response = client.post(CALLBACK_ROUTE, json=body, headers={"Accept-Encoding": encoding})
+    elapsed_ms = (time.perf_counter() - start) / repeat * 1000
+    if response.status_code != 200:
+        raise RuntimeError(f"{body['output']} returned {response.status_code}")
+    return len(response.get_data()), response.headers.get("Content-Encoding", "-"), elapsed_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bytes on the wire per dashBic tab, by Accept-Encoding")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    from ..app import server
+
+    client = server.test_client()
+    client.get("/")
+
+    print(f"{'response':<30} " + " ".join(f"{encoding + ' bytes':>12} {'ms':>6}" for encoding in ENCODINGS))
+    totals = dict.fromkeys(ENCODINGS, 0)
+    for name, body in requests():
+        # Warm the render cache so every encoding times the same work
+        client.post(CALLBACK_ROUTE, json=body)
+        cells = []
+        for encoding in ENCODINGS:
+            size, used, elapsed_ms = measure(client, body, encoding, args.repeat)
+            totals[encoding] += size
+            # A response under the compression threshold goes out as is
+            marker = " " if used != "-" or encoding == "identity" else "*"
+            cells.append(f"{size:>11,}{marker} {elapsed_ms:>6.1f}")
+        print(f"{name:<30} " + " ".join(cells))
+    print(f"{'total':<30} " + " ".join(f"{totals[encoding]:>12,} {'':>6}" for encoding in ENCODINGS))
+    print("* sent uncompressed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import argparse
+import gzip
+import time
+
+from dash import dcc
+from plotly.io.json import to_json_plotly
+
+
+def graphs(component):
+    return [c for c in component._traverse() if isinstance(c, dcc.Graph)]
+
+
+def measure(build, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        component = build()
+    build_ms = (time.perf_counter() - start) / repeat * 1000
+
+    payload = to_json_plotly(component).encode()
+    figures = [graph.figure for graph in graphs(component)]
+    # Without a browser, the size of what Plotly.newPlot has to parse and lay
+    # out (figures, traces and axes) stands in for client render time
+    return {
+        "bytes": len(payload),
+        "gzip": len(gzip.compress(payload)),
+        "figures": len(figures),
+        "traces": sum(len(fig.data) for fig in figures),
+        "axes": sum(
+            sum(1 for key in fig.layout.to_plotly_json() if key.startswith(("xaxis", "yaxis")))
+            for fig in figures
+        ),
+        "figure_bytes": sum(len(to_json_plotly(fig)) for fig in figures),
+        "build_ms": build_ms,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Separate graphs vs one subplot grid for the dashBic small multiples")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    from ..data.store import build_dataset
+    from ..layout.fineViolationRelationships import render_fine_violation_tab
+    from ..layout.frequentViolators import render_frequent_violators_content
+
+    data = build_dataset()
+    cases = {
+        "fine-violation relationships": lambda grid: render_fine_violation_tab(data.cube, grid=grid),
+        "frequent violators": lambda grid: render_frequent_violators_content(
+            data.rankings, "TotalFines", "TotalFines", grid
+        ),
+    }
+
+    print(f"{'tab':<30} {'mode':>8} {'bytes':>9} {'gzip':>8} {'figures':>7} {'traces':>6} "
+          f"{'axes':>5} {'fig bytes':>9} {'build ms':>8}")
+    for tab, build in cases.items():
+        results = {}
+        for grid in (False, True):
+            results[grid] = stats = measure(lambda: build(grid), args.repeat)
+            print(
+                f"{tab:<30} {'grid' if grid else 'separate':>8} {stats['bytes']:>9,} {stats['gzip']:>8,} "
+                f"{stats['figures']:>7} {stats['traces']:>6} {stats['axes']:>5} "
+                f"{stats['figure_bytes']:>9,} {stats['build_ms']:>8.1f}"
+            )
+        print(f"{'':<30} {'ratio':>8} {results[True]['bytes'] / results[False]['bytes']:>9.2f} "
+              f"{results[True]['gzip'] / results[False]['gzip']:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
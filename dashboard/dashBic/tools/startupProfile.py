@@ -0,0 +1,115 @@
+import argparse
+import os
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from collections import defaultdict
+
+from .deployment import APP_MODULE, CALLBACK_ROUTE, encode, tab_body, write_gunicorn_config
+
+IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)")
+
+
+def profile_imports():
+    # One cold import of the app under -X importtime, with the app's own
+    # phase report switched on
+    env = dict(os.environ, BIC_PROFILE_STARTUP="1", BIC_REFRESH_INTERVAL="0")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {APP_MODULE}"],
+        env=env, capture_output=True, text=True, check=True,
+    )
+    modules = []
+    for line in result.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            own, cumulative, indent, name = match.groups()
+            modules.append((name, int(own) / 1000, int(cumulative) / 1000, len(indent) // 2))
+    phases = [line for line in result.stdout.splitlines() if line.startswith(("dashBic startup", "   "))]
+    return modules, phases
+
+
+def report_imports(modules, top):
+    by_package = defaultdict(float)
+    for name, own_ms, _, _ in modules:
+        by_package[name.split(".")[0]] += own_ms
+
+    print(f"{'package':<28} {'import ms':>10}  (own time of all its modules)")
+    for package, ms in sorted(by_package.items(), key=lambda item: -item[1])[:top]:
+        print(f"{package:<28} {ms:>10.1f}")
+
+    # Each dashBic module with everything it was first to import
+    print(f"\n{'dashBic module':<52} {'cumulative ms':>13}")
+    for name, _, cumulative_ms, _ in modules:
+        if name.startswith("dashboard.dashBic"):
+            print(f"{name:<52} {cumulative_ms:>13.1f}")
+
+
+def time_to_ready(port, tab, timeout):
+    # Seconds from spawning gunicorn until its worker has booted the app,
+    # then for the first render of `tab` in that fresh worker
+    ready_dir = tempfile.mkdtemp(prefix="bic-startup-")
+    config_path = write_gunicorn_config(ready_dir)
+
+    # The shared callback cache would hand the first render a stored result
+    env = dict(os.environ, BIC_REFRESH_INTERVAL="0", BIC_CALLBACK_CACHE_MB="0")
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", config_path, "-w", "1",
+         "-b", f"127.0.0.1:{port}", f"{APP_MODULE}:server"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while not any(name.isdigit() for name in os.listdir(ready_dir)):
+            if server.poll() is not None or time.perf_counter() - start > timeout:
+                raise RuntimeError("gunicorn worker did not boot")
+            time.sleep(0.01)
+        ready = time.perf_counter() - start
+
+        request = urllib.request.Request(
+            f"http://127.0.0.1:{port}{CALLBACK_ROUTE}", data=encode(tab_body(tab)),
+            headers={"Content-Type": "application/json"},
+        )
+        first = time.perf_counter()
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+        return ready, time.perf_counter() - first
+    finally:
+        server.terminate()
+        server.wait()
+        shutil.rmtree(ready_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Where a dashBic worker's cold start goes")
+    parser.add_argument("--top", type=int, default=12, help="third-party packages to list")
+    parser.add_argument("--runs", type=int, default=5, help="gunicorn boots to time")
+    parser.add_argument("--tab", default="violations", help="tab rendered first after each boot")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--timeout", type=float, default=300)
+    args = parser.parse_args()
+
+    # Build the snapshot first so every boot below loads the same way
+    from ..data.loadData import load_data
+    load_data()
+
+    modules, phases = profile_imports()
+    report_imports(modules, args.top)
+    print()
+    print("\n".join(phases))
+
+    if args.runs:
+        boots = [time_to_ready(args.port, args.tab, args.timeout) for _ in range(args.runs)]
+        ready = [boot[0] * 1000 for boot in boots]
+        first = [boot[1] * 1000 for boot in boots]
+        print(f"\ngunicorn over {args.runs} boots (ms):  "
+              f"time to ready median {statistics.median(ready):.0f} (min {min(ready):.0f}), "
+              f"first '{args.tab}' render median {statistics.median(first):.0f} (min {min(first):.0f})")
+
+
+if __name__ == "__main__":
+    main()
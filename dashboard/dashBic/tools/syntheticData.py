@@ -0,0 +1,132 @@
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from ..helpers.utils import short_descriptions
+
+# Column order of the real exports; the extra columns exercise the schema's
+# column pruning the same way the full exports do
+VIOLATIONS_COLUMNS = [
+    "VIOLATION NUMBER", "BIC NUMBER", "ACCOUNT NAME", "TYPE OF VIOLATION", "DATE VIOLATION ISSUED",
+    "FINE AMOUNT", "BOROUGH OF VIOLATION", "DESCRIPTION OF RULE", "EXPORT DATE",
+]
+COMPLAINTS_COLUMNS = [
+    "COMPLAINT/INQUIRY NUMBER", "LICENSE TYPE", "ACCOUNT NAME", "BIC NUMBER",
+    "DATE COMPLAINT/INQUIRY REPORTED ON", "INDUSTRY TYPE", "SOURCE OF COMPLAINT/INQUIRY",
+    "COMPLAINT/INQUIRY STATUS", "COMPLAINT OR INQUIRY", "COMPLAINT/INQUIRY BOROUGH", "EXPORT DATE",
+]
+BOROUGHS = ["MANHATTAN", "BROOKLYN", "QUEENS", "BRONX", "STATEN ISLAND"]
+FINES = [0, 250, 500, 1000, 2500, 5000, 10000]
+FINE_WEIGHTS = [0.05, 0.3, 0.25, 0.2, 0.1, 0.07, 0.03]
+# Rule texts with no short label, so the unmatched path is exercised too
+UNMATCHED_RULES = 40
+CHUNK_ROWS = 1_000_000
+# The exports stamp this as an ISO date, unlike the MM/DD/YYYY record dates
+EXPORT_DATE = "2025-06-12"
+# Part of the file names, so files written by an older generator aren't reused
+FIXTURE_FORMAT = 2
+
+SIZES = {"10k": 10_000, "1m": 1_000_000, "10m": 10_000_000}
+
+
+def parse_size(size):
+    return SIZES.get(size.lower()) or int(size)
+
+
+def date_strings(rng, rows, first="2012-01-01", last="2025-06-01"):
+    # Formatting each distinct day once is far cheaper than per row
+    days = pd.date_range(first, last, freq="D")
+    labels = np.array(days.strftime("%m/%d/%Y"), dtype=object)
+    return labels[rng.integers(0, len(days), rows)]
+
+
+def account_names(rows):
+    return np.array([f"ACCOUNT {i} LLC" for i in range(max(rows // 50, 20))], dtype=object)
+
+
+def zipf_choice(rng, values, rows):
+    # A few accounts collect most violations, like the real data
+    weights = 1 / np.arange(1, len(values) + 1) ** 0.8
+    return values[rng.choice(len(values), rows, p=weights / weights.sum())]
+
+
+def violations_chunk(rng, start, rows, accounts, rules):
+    fines = rng.choice(FINES, rows, p=FINE_WEIGHTS).astype("float64")
+    fines[rng.random(rows) < 0.01] = np.nan
+    return pd.DataFrame({
+        "VIOLATION NUMBER": np.char.add("TWC-", np.arange(start, start + rows).astype(str)),
+        "BIC NUMBER": rng.integers(1, 20_000, rows),
+        "ACCOUNT NAME": zipf_choice(rng, accounts, rows),
+        "TYPE OF VIOLATION": "OATH",
+        "DATE VIOLATION ISSUED": date_strings(rng, rows),
+        "FINE AMOUNT": fines,
+        "BOROUGH OF VIOLATION": rng.choice(BOROUGHS, rows),
+        "DESCRIPTION OF RULE": zipf_choice(rng, rules, rows),
+        "EXPORT DATE": EXPORT_DATE,
+    }, columns=VIOLATIONS_COLUMNS)
+
+
+def complaints_chunk(rng, start, rows, accounts):
+    return pd.DataFrame({
+        "COMPLAINT/INQUIRY NUMBER": np.char.add("INQ-", np.arange(start, start + rows).astype(str)),
+        "LICENSE TYPE": rng.choice(["Trade Waste", "Public Wholesale Market", ""], rows),
+        "ACCOUNT NAME": zipf_choice(rng, accounts, rows),
+        "BIC NUMBER": rng.integers(1, 20_000, rows),
+        "DATE COMPLAINT/INQUIRY REPORTED ON": date_strings(rng, rows),
+        "INDUSTRY TYPE": "Trade Waste",
+        "SOURCE OF COMPLAINT/INQUIRY": rng.choice(["WEB-MAIL", "PHONE", "311"], rows),
+        "COMPLAINT/INQUIRY STATUS": "Closed",
+        "COMPLAINT OR INQUIRY": rng.choice(["Complaint", "Inquiry"], rows),
+        "COMPLAINT/INQUIRY BOROUGH": rng.choice(BOROUGHS, rows),
+        "EXPORT DATE": EXPORT_DATE,
+    }, columns=COMPLAINTS_COLUMNS)
+
+
+def write_chunks(path, rows, build):
+    # Written a chunk at a time so 10M rows never sit in memory at once
+    tmp_path = f"{path}.tmp"
+    for start in range(0, rows, CHUNK_ROWS):
+        build(start, min(CHUNK_ROWS, rows - start)).to_csv(
+            tmp_path, mode="w" if start == 0 else "a", header=start == 0, index=False
+        )
+    os.replace(tmp_path, path)
+
+
+def write_sources(directory, rows, seed=0):
+    # Returns {"complaints": path, "violations": path} for `rows` violations
+    # (and a quarter as many complaints), reusing files from an earlier run
+    os.makedirs(directory, exist_ok=True)
+    paths = {
+        "complaints": os.path.join(directory, f"complaints_{rows}_{seed}_v{FIXTURE_FORMAT}.csv"),
+        "violations": os.path.join(directory, f"violations_{rows}_{seed}_v{FIXTURE_FORMAT}.csv"),
+    }
+    rng = np.random.default_rng(seed)
+    accounts = account_names(rows)
+    rules = np.array(
+        [f"{text} as required by the Commission's rules" for text in short_descriptions]
+        + [f"Rule text number {i} about something regulated" for i in range(UNMATCHED_RULES)],
+        dtype=object
+    )
+
+    if not os.path.exists(paths["violations"]):
+        write_chunks(paths["violations"], rows, lambda start, n: violations_chunk(rng, start, n, accounts, rules))
+    if not os.path.exists(paths["complaints"]):
+        write_chunks(paths["complaints"], max(rows // 4, 1), lambda start, n: complaints_chunk(rng, start, n, accounts))
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write synthetic BIC complaints/violations exports")
+    parser.add_argument("directory")
+    parser.add_argument("--rows", default="10k", help=f"violation rows: a number or one of {', '.join(SIZES)}")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    for name, path in write_sources(args.directory, parse_size(args.rows), args.seed).items():
+        print(f"{name}: {path}")
+
+
+if __name__ == "__main__":
+    main()
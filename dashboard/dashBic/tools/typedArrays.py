@@ -0,0 +1,50 @@
+import argparse
+import gzip
+import time
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import plotly.io as pio
+from plotly.io.json import to_json_plotly
+
+from ..helpers.figures import typed_array
+
+
+def timed(build, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = build()
+    return result, (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON lists vs typed arrays for a large line figure")
+    parser.add_argument("--points", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    # A PnL-style line: one timestamp and one float per point
+    dates = pd.Series(pd.date_range("2000-01-01", periods=args.points, freq="min"))
+    values = pd.Series(np.random.default_rng(0).normal(size=args.points).cumsum())
+    cases = {
+        "python lists": lambda: go.Figure(go.Scatter(x=dates.tolist(), y=values.tolist())),
+        "pandas series": lambda: go.Figure(go.Scatter(x=dates, y=values)),
+        "typed arrays": lambda: go.Figure(
+            go.Scatter(x=typed_array(dates), y=typed_array(values)), layout=dict(xaxis_type='date')
+        ),
+    }
+
+    print(f"{'figure':<16} {'engine':>7} {'build ms':>9} {'encode ms':>10} {'bytes':>12} {'gzip':>12}")
+    for name, build in cases.items():
+        fig, build_ms = timed(build, args.repeat)
+        for engine in ("json", "orjson"):
+            pio.json.config.default_engine = engine
+            payload, encode_ms = timed(lambda: to_json_plotly(fig), args.repeat)
+            payload = payload.encode()
+            print(f"{name:<16} {engine:>7} {build_ms:>9.0f} {encode_ms:>10.0f} "
+                  f"{len(payload):>12,} {len(gzip.compress(payload, 6)):>12,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from .deployment import APP_MODULE, write_gunicorn_config
+
+
+def read_smaps(pid):
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1]) * 1024
+    return {
+        "rss": fields["Rss"],
+        "pss": fields["Pss"],
+        "private": fields["Private_Clean"] + fields["Private_Dirty"],
+    }
+
+
+def measure(workers, memory_map, port, timeout):
+    ready_dir = tempfile.mkdtemp(prefix="bic-workers-")
+    config_path = write_gunicorn_config(ready_dir)
+
+    env = dict(os.environ, BIC_MEMORY_MAP="1" if memory_map else "0", BIC_REFRESH_INTERVAL="0")
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", config_path, "-w", str(workers),
+         "-b", f"127.0.0.1:{port}", f"{APP_MODULE}:server"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = time.time() + timeout
+        while True:
+            pids = [int(name) for name in os.listdir(ready_dir) if name.isdigit()]
+            if len(pids) >= workers:
+                break
+            if server.poll() is not None or time.time() > deadline:
+                raise RuntimeError(f"gunicorn did not start {workers} workers")
+            time.sleep(0.2)
+        # Let page faults from the first requests-free boot settle
+        time.sleep(1)
+        return [read_smaps(pid) for pid in pids]
+    finally:
+        server.terminate()
+        server.wait()
+        shutil.rmtree(ready_dir, ignore_errors=True)
+
+
+def mb(num_bytes):
+    return f"{num_bytes / 1024 ** 2:8.1f}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-worker memory of the dashBic gunicorn deployment")
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 4, 8])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--timeout", type=float, default=300)
+    args = parser.parse_args()
+
+    # Build the snapshot once up front so no worker pays for parsing the CSVs
+    from ..data.loadData import load_data
+    load_data()
+
+    print(f"{'workers':>7} {'mode':>6} {'RSS/worker':>10} {'PSS/worker':>10} {'USS/worker':>10} {'total PSS':>10}  (MB)")
+    for workers in args.workers:
+        for memory_map in (False, True):
+            stats = measure(workers, memory_map, args.port, args.timeout)
+            n = len(stats)
+            print(
+                f"{workers:>7} {'mmap' if memory_map else 'copy':>6} "
+                f"{mb(sum(s['rss'] for s in stats) / n):>10} "
+                f"{mb(sum(s['pss'] for s in stats) / n):>10} "
+                f"{mb(sum(s['private'] for s in stats) / n):>10} "
+                f"{mb(sum(s['pss'] for s in stats)):>10}"
+            )
+
+
+if __name__ == "__main__":
+    main()
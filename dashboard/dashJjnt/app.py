@@ -8,8 +8,9 @@ import os
 import gspread
 from oauth2client.service_account import ServiceAccountCredentials
 
-from data.loadData import load_and_prepare_data, append_new_entry
-from layout.bobData import render_trading_trends
+from .data.loadData import load_and_prepare_data, append_new_entry
+from .layout.bobData import render_trading_trends
+from ..shared.callbackMetrics import CallbackMetrics
 
 # --- Dash App Setup ---
 app = dash.Dash(
@@ -20,11 +21,17 @@ app = dash.Dash(
 app.title = "JJNT Data Dashboard"
 server = app.server
 
+TAB_IDS = ["overview", "BB", "c1", "c2", "c3"]
+
+# Per-callback latency, size and exception metrics on /metrics
+callback_metrics = CallbackMetrics(server, app.callback_map, label_inputs={"tab": ("tabs", TAB_IDS)})
+
 # --- App Layout ---
 app.layout = dbc.Container([
     dbc.NavbarSimple(
         brand="JJNT Data Dashboard", color="primary", dark=True, fluid=True, className="mb-4"
     ),
+    # Keep TAB_IDS in step with these
     dbc.Tabs([
         dbc.Tab(label="Overview & Summary", tab_id="overview"),
         dbc.Tab(label="Bob Trading", tab_id="BB"),
@@ -62,5 +69,7 @@ for s in client.openall():
     print("   -", s.title)
 
 # --- Run App ---
+# From the repository root: python -m dashboard.dashJjnt.app
+# (or gunicorn dashboard.dashJjnt.app:server)
 if __name__ == "__main__":
     app.run(debug=True)
\ No newline at end of file
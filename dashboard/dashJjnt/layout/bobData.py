@@ -7,7 +7,8 @@ import pandas as pd
 import os
 import gspread
 from oauth2client.service_account import ServiceAccountCredentials
-from data.loadData import load_and_prepare_data
+from ..data.loadData import load_and_prepare_data
+from ...shared.figures import typed_array
 
 # Google Sheets setup
 scope = ['https://spreadsheets.google.com/feeds', 'https://www.googleapis.com/auth/drive']
@@ -143,16 +144,21 @@ def update_graphs(start_date, end_date):
         df_pivot[col] = pd.to_numeric(df_pivot[col], errors='coerce')
     df_pivot["Total PnL"] = df_pivot[pnl_cols].sum(axis=1)
 
+    # Dates and PnL go out as typed arrays rather than one JSON string or
+    # number per point
+    dates = typed_array(df_pivot['Date'])
+    pnl = {col: typed_array(df_pivot[col].astype('float64')) for col in [*pnl_cols, "Total PnL"]}
+
     # Main Graph
     main_fig = go.Figure()
     for col in pnl_cols:
-        main_fig.add_trace(go.Scatter(x=df_pivot['Date'], y=df_pivot[col], mode='lines+markers', name=col))
-    main_fig.add_trace(go.Scatter(x=df_pivot['Date'], y=df_pivot["Total PnL"],
+        main_fig.add_trace(go.Scatter(x=dates, y=pnl[col], mode='lines+markers', name=col))
+    main_fig.add_trace(go.Scatter(x=dates, y=pnl["Total PnL"],
                                   mode='lines+markers', name="Total PnL",
                                   line=dict(color='white', width=3, dash='dot')))
     main_fig.update_layout(
         title=dict(text="Daily PnL by Instrument", x=0.5),
-        xaxis_title="Date", yaxis_title="PnL ($)",
+        xaxis_title="Date", yaxis_title="PnL ($)", xaxis_type='date',
         plot_bgcolor='#1e1e1e', paper_bgcolor='#1e1e1e', font_color='white',
         height=700,
         legend=dict(orientation='h', y=-0.3, x=0.5, xanchor='center'),
@@ -167,11 +173,11 @@ def update_graphs(start_date, end_date):
         row_children = []
         for col in pnl_cols[i:i+2]:
             fig = go.Figure()
-            fig.add_trace(go.Scatter(x=df_pivot['Date'], y=df_pivot[col], mode='lines+markers', name=col))
+            fig.add_trace(go.Scatter(x=dates, y=pnl[col], mode='lines+markers', name=col))
             fig.add_shape(type='line', x0=df_pivot['Date'].min(), x1=df_pivot['Date'].max(), y0=0, y1=0,
                           line=dict(color='yellow', width=3))
             fig.update_layout(
-                title=f"{col} Daily PnL", xaxis_title="Date", yaxis_title="PnL ($)",
+                title=f"{col} Daily PnL", xaxis_title="Date", yaxis_title="PnL ($)", xaxis_type='date',
                 height=400, plot_bgcolor='#1e1e1e', paper_bgcolor='#1e1e1e', font_color='white'
             )
             row_children.append(dbc.Col(dcc.Graph(figure=fig), width=6))
@@ -0,0 +1,275 @@
+import bisect
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from flask import Response, g, got_request_exception, request
+
+DURATION_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10]
+SIZE_BUCKETS = [1024 * 4 ** i for i in range(9)]  # 1 KB .. 64 MB
+CALLBACK_ROUTE = "/_dash-update-component"
+DURATION = "dash_callback_duration_seconds"
+SIZE = "dash_callback_response_bytes"
+EXCEPTIONS = "dash_callback_exceptions_total"
+# Label value for callbacks and inputs that aren't known to the app
+OTHER = "other"
+# Seconds a worker holds its observations before adding them to the shared file
+FLUSH_INTERVAL = 1.0
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def lines(self, name, labels):
+        total = 0
+        for bound, count in zip([*self.buckets, "+Inf"], self.counts):
+            total += count
+            yield f'{name}_bucket{{{labels},le="{bound}"}} {total}'
+        yield f"{name}_sum{{{labels}}} {self.sum}"
+        yield f"{name}_count{{{labels}}} {total}"
+
+
+def known(value, allowed):
+    # Client-supplied label values become series, so anything unexpected
+    # (unknown ids, lists, numbers) shares one
+    try:
+        return value if isinstance(value, str) and value in allowed else OTHER
+    except TypeError:
+        return OTHER
+
+
+def escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class SharedSamples:
+    # Counter values summed over every worker on the host in one SQLite file.
+    # Workers add deltas, so a scrape answered by any of them sees the same
+    # totals, and totals only grow (a restarted worker's counts stay in).
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._warned = False
+
+    def _connection(self):
+        # One connection per thread, reopened after a fork
+        connection = getattr(self._local, "connection", None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS samples ("
+                "metric TEXT NOT NULL, labels TEXT NOT NULL, slot TEXT NOT NULL, value REAL NOT NULL, "
+                "PRIMARY KEY (metric, labels, slot))"
+            )
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def _failed(self, error):
+        if not self._warned:
+            print(f"Callback metrics file {self.path} unavailable ({error}); /metrics shows this worker only")
+            self._warned = True
+
+    def add(self, deltas):
+        # deltas maps (metric, labels, slot) to the amount to add; returns
+        # False (keeping nothing) when the file can't be written
+        try:
+            connection = self._connection()
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                connection.executemany(
+                    "INSERT INTO samples VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT (metric, labels, slot) DO UPDATE SET value = value + excluded.value",
+                    [(metric, json.dumps(labels), slot, value) for (metric, labels, slot), value in deltas.items()],
+                )
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+        except sqlite3.Error as e:
+            self._failed(e)
+            return False
+        return True
+
+    def read(self):
+        try:
+            rows = self._connection().execute("SELECT metric, labels, slot, value FROM samples").fetchall()
+        except sqlite3.Error as e:
+            self._failed(e)
+            return None
+        return {(metric, tuple(json.loads(labels)), slot): value for metric, labels, slot, value in rows}
+
+
+class CallbackMetrics:
+    # Latency, response size and exceptions for every Dash callback request,
+    # served on /metrics in the Prometheus text format. Each request only
+    # updates a few in-memory counters; every FLUSH_INTERVAL seconds a worker
+    # adds them to a SQLite file shared by all workers on the host (store),
+    # so /metrics reports the same totals whichever worker answers.
+    # Labels come from the request body, so only known values are kept and
+    # anything else is counted as OTHER: callbacks is the app's callback_map
+    # (outputs registered later are picked up), and label_inputs maps extra
+    # label names to an input id and the values worth a series of their own,
+    # e.g. {"tab": ("tabs", TABS)} to split the tab callback per tab.
+    def __init__(self, server, callbacks, label_inputs=None, path="/metrics", store=None,
+                 flush_interval=FLUSH_INTERVAL):
+        self.callbacks = callbacks
+        self.label_inputs = label_inputs or {}
+        self.flush_interval = flush_interval
+        store = store or os.path.join(tempfile.gettempdir(), f"{server.name}-metrics.sqlite3")
+        self.samples = SharedSamples(store)
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._flusher_pid = None
+
+        server.before_request(self._start)
+        server.after_request(self._finish)
+        got_request_exception.connect(self._failed, server, weak=False)
+        server.add_url_rule(path, "callback_metrics", self.render)
+
+    def _labels(self):
+        body = request.get_json(silent=True)
+        if not isinstance(body, dict):
+            body = {}
+        inputs = body.get("inputs")
+        values = {
+            item.get("id"): item.get("value")
+            for item in inputs if isinstance(item, dict)
+        } if isinstance(inputs, list) else {}
+        return (known(body.get("output"), self.callbacks),) + tuple(
+            known(values.get(input_id) if isinstance(input_id, str) else None, allowed)
+            for input_id, allowed in self.label_inputs.values()
+        )
+
+    def _start(self):
+        # Metrics must never fail the request they measure
+        try:
+            if request.path.endswith(CALLBACK_ROUTE):
+                g.callback_metrics = (self._labels(), time.perf_counter())
+        except Exception:
+            g.pop("callback_metrics", None)
+
+    def _add(self, metric, labels, slot, value):
+        key = (metric, labels, slot)
+        self._pending[key] = self._pending.get(key, 0) + value
+
+    def _observe(self, metric, buckets, labels, value):
+        self._add(metric, labels, str(bisect.bisect_left(buckets, value)), 1)
+        self._add(metric, labels, "sum", value)
+
+    def _finish(self, response):
+        # after_request hooks run in reverse order, so with flask-compress
+        # set up first this sees the serialized JSON, not the compressed body
+        started = g.pop("callback_metrics", None)
+        if started is None:
+            return response
+        try:
+            labels, start = started
+            elapsed = time.perf_counter() - start
+            size = response.calculate_content_length() or 0
+            with self._lock:
+                self._observe(DURATION, DURATION_BUCKETS, labels, elapsed)
+                self._observe(SIZE, SIZE_BUCKETS, labels, size)
+            self._ensure_flusher()
+        except Exception:
+            pass
+        return response
+
+    def _failed(self, sender, exception, **extra):
+        started = g.get("callback_metrics")
+        if started is None:
+            return
+        try:
+            with self._lock:
+                self._add(EXCEPTIONS, started[0] + (type(exception).__name__,), "", 1)
+            self._ensure_flusher()
+        except Exception:
+            pass
+
+    def _ensure_flusher(self):
+        # Started on first use in each process, since a thread started
+        # before gunicorn forks doesn't survive in the workers
+        if self._flusher_pid == os.getpid():
+            return
+        with self._lock:
+            if self._flusher_pid == os.getpid():
+                return
+            self._flusher_pid = os.getpid()
+        threading.Thread(target=self._flush_forever, name="callback-metrics-flush", daemon=True).start()
+
+    def _flush_forever(self):
+        while True:
+            time.sleep(self.flush_interval)
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if pending and not self.samples.add(pending):
+            # Keep counting locally until the file is usable again
+            with self._lock:
+                for key, value in pending.items():
+                    self._pending[key] = self._pending.get(key, 0) + value
+
+    def _relabel(self, labels):
+        size = 1 + len(self.label_inputs)
+        known_labels = (known(labels[0], self.callbacks),) + tuple(
+            known(value, allowed) for value, (_, allowed) in zip(labels[1:size], self.label_inputs.values())
+        )
+        return known_labels + tuple(labels[size:])
+
+    def _format_labels(self, values, extra=()):
+        names = ["callback", *self.label_inputs, *extra]
+        return ",".join(f'{name}="{escape(value)}"' for name, value in zip(names, values))
+
+    def render(self):
+        self.flush()
+        samples = self.samples.read()
+        with self._lock:
+            # Whatever this worker couldn't flush, so a broken file still reports something
+            pending = dict(self._pending)
+        samples = samples or {}
+        for key, value in pending.items():
+            samples[key] = samples.get(key, 0) + value
+
+        histograms = {DURATION: {}, SIZE: {}}
+        exceptions = {}
+        buckets = {DURATION: DURATION_BUCKETS, SIZE: SIZE_BUCKETS}
+        for (metric, labels, slot), value in sorted(samples.items()):
+            # Series written before a callback or tab was dropped (or by an
+            # older version that kept any value) fold into OTHER
+            labels = self._relabel(labels)
+            if metric == EXCEPTIONS:
+                exceptions[labels] = exceptions.get(labels, 0) + int(value)
+                continue
+            if metric not in histograms:
+                continue
+            histogram = histograms[metric].setdefault(labels, Histogram(buckets[metric]))
+            if slot == "sum":
+                histogram.sum += value
+            elif slot.isdigit() and int(slot) < len(histogram.counts):
+                histogram.counts[int(slot)] += int(value)
+
+        lines = [
+            f"# HELP {DURATION} Time to run a Dash callback and serialize its response.",
+            f"# TYPE {DURATION} histogram",
+            *(line for labels, h in histograms[DURATION].items()
+              for line in h.lines(DURATION, self._format_labels(labels))),
+            f"# HELP {SIZE} Serialized size of Dash callback responses.",
+            f"# TYPE {SIZE} histogram",
+            *(line for labels, h in histograms[SIZE].items()
+              for line in h.lines(SIZE, self._format_labels(labels))),
+            f"# HELP {EXCEPTIONS} Dash callbacks that raised, by exception type.",
+            f"# TYPE {EXCEPTIONS} counter",
+            *(f"{EXCEPTIONS}{{{self._format_labels(key, ['exception'])}}} {count}"
+              for key, count in exceptions.items()),
+        ]
+        return Response("\n".join(lines) + "\n", mimetype="text/plain; version=0.0.4")
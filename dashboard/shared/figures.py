@@ -0,0 +1,13 @@
+import numpy as np
+
+
+def typed_array(values):
+    # Plotly 6 ships numeric NumPy arrays as base64 typed buffers instead of
+    # JSON numbers; dates become epoch milliseconds, so the axis showing
+    # them needs type='date'
+    array = np.asarray(values)
+    if np.issubdtype(array.dtype, np.datetime64):
+        millis = array.astype('datetime64[ms]')
+        array = millis.astype('int64').astype('float64')
+        array[np.isnat(millis)] = np.nan
+    return np.ascontiguousarray(array)
@@ -0,0 +1,17 @@
+import pytest
+
+from dashboard.dashBic.data import loadData
+from dashboard.dashBic.tools.syntheticData import write_sources
+
+
+@pytest.fixture
+def bic_sources(tmp_path, monkeypatch):
+    # Small synthetic exports as local BIC_*_SOURCE files, with the snapshot
+    # in tmp_path and every load in full (non-streaming, non-incremental) mode
+    sources = write_sources(str(tmp_path / "sources"), 2000)
+    monkeypatch.setattr(loadData, "COMPLAINTS_SOURCE", sources["complaints"])
+    monkeypatch.setattr(loadData, "VIOLATIONS_SOURCE", sources["violations"])
+    monkeypatch.setattr(loadData, "SNAPSHOT_DIR", str(tmp_path / "snapshot"))
+    monkeypatch.setattr(loadData, "CHUNK_ROWS", 0)
+    monkeypatch.setattr(loadData, "INCREMENTAL", False)
+    return sources
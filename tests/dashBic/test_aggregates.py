@@ -0,0 +1,126 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from dashboard.dashBic.data.aggregates import (
+    FOLD_BATCH,
+    build_aggregates,
+    build_fine_counts,
+    finish_aggregates,
+    fine_box_stats,
+    fine_median,
+    fold_aggregates,
+    push_aggregates,
+    weighted_median,
+)
+from dashboard.dashBic.data.cube import CUBE_KEYS
+
+FINES = [0, 25, 50, 100, 100, 250, 500, 1000, 5000, np.nan]
+
+
+def violations(rows, seed=0):
+    # Prepared violations as the aggregates see them; a few fines repeat,
+    # some are missing and the odd rule is never dated
+    rng = np.random.default_rng(seed)
+    rules = np.array(["rule a", "rule b", "rule c", "rule d"])
+    frame = pd.DataFrame({
+        "Year": rng.integers(2015, 2026, rows).astype("int16"),
+        "ShortLabel": pd.Categorical(rng.choice(["Signage", "Hours", "Licensing"], rows)),
+        "ACCOUNT NAME": pd.Categorical(rng.choice(["Acme", "Bravo", "Cargo", "Delta", "Echo"], rows)),
+        "FINE AMOUNT": rng.choice(FINES, rows).astype("float32"),
+        "DESCRIPTION OF RULE": pd.Categorical(rng.choice(rules, rows)),
+        "DATE VIOLATION ISSUED": pd.Timestamp("2015-01-01") + pd.to_timedelta(rng.integers(0, 3800, rows), unit="D"),
+    })
+    frame.loc[rng.random(rows) < 0.05, "DATE VIOLATION ISSUED"] = pd.NaT
+    return frame
+
+
+def sort_frame(frame, keys):
+    return frame.sort_values(keys).reset_index(drop=True)
+
+
+def assert_same_aggregates(actual, expected):
+    pd.testing.assert_frame_equal(
+        sort_frame(actual["cube"], CUBE_KEYS), sort_frame(expected["cube"], CUBE_KEYS),
+        check_categorical=False,
+    )
+    fine_keys = ["Year", "ShortLabel", "FINE AMOUNT"]
+    pd.testing.assert_frame_equal(
+        sort_frame(actual["fine_counts"], fine_keys), sort_frame(expected["fine_counts"], fine_keys),
+        check_categorical=False,
+    )
+    rule = ["DESCRIPTION OF RULE"]
+    pd.testing.assert_frame_equal(
+        sort_frame(actual["first_seen"], rule), sort_frame(expected["first_seen"], rule),
+        check_categorical=False,
+    )
+
+
+def chunks(frame, count):
+    return [frame.iloc[i::count] for i in range(count)]
+
+
+def test_fold_matches_one_shot_build():
+    frame = violations(3000)
+    parts = [build_aggregates(chunk) for chunk in chunks(frame, 5)]
+    assert_same_aggregates(fold_aggregates(parts), build_aggregates(frame))
+
+
+@pytest.mark.parametrize("count", [1, FOLD_BATCH - 1, FOLD_BATCH, FOLD_BATCH ** 2 + 3])
+def test_streamed_fold_matches_one_shot_build(count):
+    frame = violations(3000, seed=count)
+    levels = []
+    for chunk in chunks(frame, count):
+        push_aggregates(levels, build_aggregates(chunk))
+    # Never more than a batch's worth of parts waiting on any level
+    assert all(len(level) < FOLD_BATCH for level in levels)
+    assert_same_aggregates(finish_aggregates(levels), build_aggregates(frame))
+
+
+def expanded_fines(frame):
+    fines = frame["FINE AMOUNT"].dropna().to_numpy(dtype="float64")
+    return fines[fines > 0]
+
+
+def positive_counts(frame):
+    # The box chart only draws positive fines
+    counts = build_fine_counts(frame)
+    return counts[counts["FINE AMOUNT"] > 0]
+
+
+@pytest.mark.parametrize("rows", [1, 2, 3, 7, 500, 2001])
+def test_box_stats_match_linear_percentiles(rows):
+    frame = violations(rows, seed=rows)
+    fines = expanded_fines(frame)
+    stats = fine_box_stats(positive_counts(frame))
+    if fines.size == 0:
+        assert stats is None
+        return
+
+    # plotly.js places the quartile of n sorted values at p * n - 0.5,
+    # which is NumPy's "hazen" method; boxpoints=False puts the whiskers
+    # at the extremes
+    expected = np.percentile(fines, [25, 50, 75], method="hazen")
+    assert stats[["q1", "median", "q3"]].to_numpy() == pytest.approx(expected)
+    assert stats["lowerfence"] == fines.min()
+    assert stats["upperfence"] == fines.max()
+
+
+def test_box_stats_without_positive_fines():
+    frame = violations(50)
+    frame["FINE AMOUNT"] = np.float32(0)
+    assert fine_box_stats(positive_counts(frame)) is None
+
+
+@pytest.mark.parametrize("rows", [2, 3, 9, 10, 1000])
+def test_fine_median_matches_series_median(rows):
+    frame = violations(rows, seed=rows)
+    expected = frame["FINE AMOUNT"].astype("float64").median()
+    assert fine_median(build_fine_counts(frame)) == pytest.approx(expected, nan_ok=True)
+
+
+def test_weighted_median_with_unsorted_repeated_amounts():
+    amounts = np.array([30.0, 10.0, 20.0, 10.0])
+    rows = np.array([1, 2, 1, 0])
+    assert weighted_median(amounts, rows) == np.median([10, 10, 20, 30])
+    assert np.isnan(weighted_median(amounts, np.zeros(4, dtype=int)))
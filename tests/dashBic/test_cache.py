@@ -0,0 +1,81 @@
+import sqlite3
+import types
+
+from dashboard.dashBic.helpers.cache import CallbackCache, RenderCache
+
+
+def cache(tmp_path, **kwargs):
+    return CallbackCache(path=str(tmp_path / "callbacks.sqlite3"), max_bytes=1024 ** 2, fingerprint="test", **kwargs)
+
+
+def snapshot():
+    return types.SimpleNamespace(version="v1")
+
+
+def test_render_cache_is_checked_before_the_file(tmp_path):
+    shared, local = cache(tmp_path), RenderCache()
+    calls = []
+
+    @shared.cached(snapshot, local=local)
+    def render(tab, data):
+        calls.append(tab)
+        return {"tab": tab, "version": data.version}
+
+    assert render("overview") == {"tab": "overview", "version": "v1"}
+    assert render("overview") == {"tab": "overview", "version": "v1"}
+    assert calls == ["overview"]
+    # The repeat was served by this process without reading the file
+    assert (shared.hits, shared.misses) == (0, 1)
+    assert (local.hits, local.misses) == (1, 1)
+
+
+def test_other_workers_fill_their_render_cache_from_the_file(tmp_path):
+    first, second = cache(tmp_path), cache(tmp_path)
+    calls = []
+
+    def render(tab, data):
+        calls.append(tab)
+        return {"tab": tab}
+
+    first.cached(snapshot, local=RenderCache())(render)("trends")
+    local = RenderCache()
+    other = second.cached(snapshot, local=local)(render)
+    other("trends")
+    other("trends")
+    assert calls == ["trends"]
+    assert second.hits == 1
+    assert local.hits == 1
+
+
+def test_hits_only_refresh_access_time_once_it_is_stale(tmp_path):
+    shared = cache(tmp_path)
+    shared.put("key", {"a": 1})
+    path = str(tmp_path / "callbacks.sqlite3")
+
+    def accessed():
+        with sqlite3.connect(path) as connection:
+            return connection.execute("SELECT accessed FROM entries").fetchone()[0]
+
+    written = accessed()
+    assert shared.get("key") == {"a": 1}
+    assert accessed() == written
+
+    with sqlite3.connect(path) as connection:
+        connection.execute("UPDATE entries SET accessed = accessed - 3600")
+    assert shared.get("key") == {"a": 1}
+    assert accessed() > written - 3600
+
+
+def test_disabled_file_still_uses_render_cache(tmp_path):
+    shared = CallbackCache(path=str(tmp_path / "callbacks.sqlite3"), max_bytes=0)
+    calls = []
+
+    @shared.cached(snapshot, local=RenderCache())
+    def render(tab, data):
+        calls.append(tab)
+        return {"tab": tab}
+
+    render("overview")
+    render("overview")
+    assert calls == ["overview"]
+    assert not (tmp_path / "callbacks.sqlite3").exists()
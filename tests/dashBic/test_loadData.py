@@ -0,0 +1,33 @@
+import pandas as pd
+
+from dashboard.dashBic.data import loadData
+from dashboard.dashBic.data.cube import CUBE_KEYS
+
+
+def sorted_cube(frames):
+    return frames["cube"].sort_values(CUBE_KEYS).reset_index(drop=True)
+
+
+def test_switching_off_streaming_rebuilds_with_violations(bic_sources, monkeypatch):
+    monkeypatch.setattr(loadData, "CHUNK_ROWS", 500)
+    streamed_version, streamed = loadData.load_data()
+    assert "violations" not in streamed
+
+    # The streamed snapshot was just checked, but it can't serve full loads
+    monkeypatch.setattr(loadData, "CHUNK_ROWS", 0)
+    version, frames = loadData.load_data()
+    assert version != streamed_version
+    assert len(frames["violations"]) == frames["cube"]["Rows"].sum()
+    pd.testing.assert_frame_equal(sorted_cube(frames), sorted_cube(streamed), check_categorical=False)
+
+
+def test_each_mode_reuses_its_own_snapshot(bic_sources, monkeypatch):
+    full_version, _ = loadData.load_data()
+    incremental_version, frames = loadData.load_data(incremental=True)
+    assert incremental_version != full_version
+    assert "violations_hashes" in frames
+
+    # Unchanged sources and mode: served from the snapshot without a rebuild
+    assert loadData.load_data(incremental=True, max_age=0)[0] == incremental_version
+    assert loadData.load_data(incremental=True, max_age=0, current_version=incremental_version) is None
+    assert loadData.load_data(max_age=0)[0] == full_version
@@ -0,0 +1,118 @@
+import types
+
+import pandas as pd
+import pytest
+
+from dashboard.dashBic.data.refresher import DataRefresher
+from dashboard.dashBic.data.store import DataStore, build_dataset
+
+
+def dataset(version):
+    return types.SimpleNamespace(version=version)
+
+
+class FakeBuild:
+    # Hands out the queued results in order and records what it was asked
+    def __init__(self, *results):
+        self.results = list(results)
+        self.calls = []
+
+    def __call__(self, max_age, current_version):
+        self.calls.append((max_age, current_version))
+        result = self.results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+def loaded_store(version="v1"):
+    store = DataStore()
+    store.publish(dataset(version))
+    return store
+
+
+def test_refresh_swaps_in_new_version():
+    store = loaded_store()
+    published = []
+    store.subscribe(published.append)
+    build = FakeBuild(dataset("v2"))
+
+    assert DataRefresher(store, interval=1, build=build).refresh_once()
+    assert store.version == "v2"
+    assert build.calls == [(0, "v1")]
+    assert [d.version for d in published] == ["v2"]
+
+
+def test_unchanged_sources_keep_current_dataset():
+    store = loaded_store()
+    current = store.get()
+
+    assert not DataRefresher(store, interval=1, build=FakeBuild(None)).refresh_once()
+    assert store.get() is current
+
+
+def test_same_version_is_not_republished():
+    store = loaded_store()
+    published = []
+    store.subscribe(published.append)
+
+    assert not DataRefresher(store, interval=1, build=FakeBuild(dataset("v1"))).refresh_once()
+    assert published == []
+
+
+def test_failed_build_keeps_version_and_retries(capsys):
+    store = loaded_store()
+    current = store.get()
+    build = FakeBuild(OSError("source unreachable"), dataset("v2"))
+    refresher = DataRefresher(store, interval=1, build=build)
+    # Runs the loop body twice without waiting, then stops
+    waits = iter([False, False, True])
+    refresher._stop = types.SimpleNamespace(wait=lambda timeout: next(waits))
+
+    refresher._run()
+
+    output = capsys.readouterr().out
+    assert "refresh failed, keeping version v1: source unreachable" in output
+    assert "refreshed to version v2" in output
+    assert store.version == "v2"
+    assert current.version == "v1"
+
+
+def test_refresh_once_raises_build_errors():
+    store = loaded_store()
+    with pytest.raises(OSError):
+        DataRefresher(store, interval=1, build=FakeBuild(OSError("boom"))).refresh_once()
+    assert store.version == "v1"
+
+
+def test_zero_interval_does_not_start():
+    assert not DataRefresher(loaded_store(), interval=0, build=FakeBuild()).start()
+
+
+def test_get_before_load_raises():
+    with pytest.raises(RuntimeError):
+        DataStore().get()
+
+
+def test_refresh_from_local_sources(bic_sources):
+    store = DataStore()
+    store.publish(build_dataset())
+    published = []
+    store.subscribe(published.append)
+    refresher = DataRefresher(store, interval=1)
+    first = store.get()
+
+    # Sources untouched: nothing to swap
+    assert not refresher.refresh_once()
+    assert store.get() is first
+
+    # A new export without the last 100 violations
+    violations = pd.read_csv(bic_sources["violations"], dtype=str)
+    violations.iloc[:-100].to_csv(bic_sources["violations"], index=False)
+    dropped = pd.to_datetime(violations["DATE VIOLATION ISSUED"].iloc[-100:], format="%m/%d/%Y")
+
+    assert refresher.refresh_once()
+    assert store.version != first.version
+    assert published == [store.get()]
+    assert first.cube["Rows"].sum() - store.get().cube["Rows"].sum() == (dropped.dt.year >= 2015).sum()
+    assert len(store.get().violations) == len(first.violations) - (dropped.dt.year >= 2015).sum()
@@ -0,0 +1,44 @@
+import json
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import plotly.io as pio
+import pytest
+from plotly.io.json import to_json_plotly
+
+from dashboard.dashBic.helpers.figures import TEMPLATE, typed_array
+
+pytest.importorskip("orjson")
+
+
+def payloads():
+    dates = pd.date_range("2015-01-01", periods=50, freq="D")
+    values = np.linspace(0, 1, 50)
+    values[3] = np.nan
+    figure = go.Figure(go.Scatter(x=typed_array(dates), y=typed_array(values.astype("float32"))))
+    figure.add_trace(go.Bar(x=np.arange(50, dtype="int16"), y=pd.Series(values)))
+    figure.update_layout(template=TEMPLATE, xaxis_type="date")
+    return {
+        "figure": figure,
+        # dcc.Store data and component props: plain NumPy values, not figures
+        "store": {"counts": np.arange(5), "total": np.int64(7), "mean": np.float64(2.5), "share": np.float32(0.5)},
+        "labels": np.array(["a", "b"], dtype=object),
+    }
+
+
+@pytest.mark.parametrize("name", ["figure", "store", "labels"])
+def test_orjson_matches_json_engine(name):
+    value = payloads()[name]
+    assert json.loads(to_json_plotly(value, engine="orjson")) == json.loads(to_json_plotly(value, engine="json"))
+
+
+def test_figure_arrays_are_typed_buffers():
+    figure = json.loads(to_json_plotly(payloads()["figure"], engine="orjson"))
+    assert set(figure["data"][0]["x"]) == {"dtype", "bdata"}
+    assert figure["data"][0]["y"]["dtype"] == "f4"
+    assert figure["data"][1]["x"]["dtype"] == "i2"
+
+
+def test_template_is_not_the_process_default():
+    assert pio.templates.default != TEMPLATE
@@ -0,0 +1,133 @@
+import json
+import os
+
+import pandas as pd
+import pytest
+
+from dashboard.dashBic.data import loadData, snapshot
+
+
+def frames(seed):
+    return {
+        "complaints": pd.DataFrame({"Year": pd.Series([2015, 2016], dtype="int16"), "Id": [seed, seed + 1]}),
+        "cube": pd.DataFrame({"Rows": [seed, 2 * seed]}),
+    }
+
+
+def write(directory, version, seed=1):
+    return snapshot.write_snapshot(str(directory), frames(seed), {"violations": f"source-{version}"}, version)
+
+
+def snapshot_files(directory):
+    return sorted(name for name in os.listdir(directory) if name != snapshot.MANIFEST_NAME)
+
+
+def test_manifest_describes_what_was_written(tmp_path):
+    written = write(tmp_path, "v1")
+    manifest = snapshot.read_manifest(str(tmp_path))
+
+    assert manifest == written
+    assert manifest["format"] == snapshot.SNAPSHOT_FORMAT
+    assert manifest["version"] == "v1"
+    assert manifest["sources"] == {"violations": "source-v1"}
+    assert manifest["files"] == {"complaints": "complaints-v1.feather", "cube": "cube-v1.feather"}
+    for memory_map in (True, False):
+        read = snapshot.read_snapshot(str(tmp_path), manifest, memory_map=memory_map)
+        for name, frame in frames(1).items():
+            pd.testing.assert_frame_equal(read[name], frame)
+
+
+@pytest.mark.parametrize("contents", ["{not json", json.dumps({"format": snapshot.SNAPSHOT_FORMAT - 1})])
+def test_unreadable_or_old_manifest_is_ignored(tmp_path, contents):
+    (tmp_path / snapshot.MANIFEST_NAME).write_text(contents)
+    assert snapshot.read_manifest(str(tmp_path)) is None
+    assert snapshot.read_manifest(str(tmp_path / "missing")) is None
+
+
+def test_new_version_leaves_the_previous_one_readable(tmp_path):
+    first = write(tmp_path, "v1", seed=1)
+    write(tmp_path, "v2", seed=10)
+
+    # A worker still holding the old manifest reads a consistent old set
+    old = snapshot.read_snapshot(str(tmp_path), first)
+    pd.testing.assert_frame_equal(old["cube"], frames(1)["cube"])
+    assert snapshot.read_manifest(str(tmp_path))["version"] == "v2"
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+
+
+def test_failed_write_keeps_the_current_manifest(tmp_path, monkeypatch):
+    write(tmp_path, "v1")
+
+    def broken(df, path):
+        with open(path, "w") as f:
+            f.write("partial")
+        raise OSError("disk full")
+
+    monkeypatch.setattr(snapshot, "write_frame", broken)
+    with pytest.raises(OSError):
+        write(tmp_path, "v2")
+
+    assert snapshot.read_manifest(str(tmp_path))["version"] == "v1"
+    assert snapshot_files(tmp_path) == ["complaints-v1.feather", "cube-v1.feather"]
+
+
+def test_old_versions_are_pruned(tmp_path):
+    for i, version in enumerate(["v1", "v2", "v3", "v4"]):
+        write(tmp_path, version)
+        # Distinct, increasing mtimes regardless of the filesystem's resolution
+        for name in snapshot_files(tmp_path):
+            if name.endswith(f"-{version}.feather"):
+                os.utime(tmp_path / name, (1000 + i, 1000 + i))
+
+    kept = {name.rsplit("-", 1)[1][:-len(".feather")] for name in snapshot_files(tmp_path)}
+    # The current version and the most recent ones before it
+    assert kept == {f"v{4 - i}" for i in range(snapshot.KEEP_VERSIONS)}
+
+
+def test_unreachable_source_serves_the_last_snapshot(bic_sources, monkeypatch, capsys):
+    version, built = loadData.load_data()
+
+    monkeypatch.setattr(loadData, "VIOLATIONS_SOURCE", bic_sources["violations"] + ".gone")
+    served_version, served = loadData.load_data(max_age=0)
+    assert served_version == version
+    pd.testing.assert_frame_equal(served["cube"], built["cube"])
+    assert f"serving snapshot {version}" in capsys.readouterr().out
+
+    # Without a snapshot there is nothing to fall back on
+    with pytest.raises(OSError):
+        loadData.load_data(use_snapshot=False)
+
+
+def mixed_frame():
+    return pd.DataFrame({
+        "Fine": pd.Series([250.0, float("nan"), 0.0, 1e6], dtype="float32"),
+        "Total": [1.5, float("nan"), float("nan"), -2.0],
+        "Issued": pd.to_datetime(["2015-01-02", None, "2025-06-11", None]),
+        "Label": pd.Categorical(["Signage", None, "Hours", "Signage"]),
+        "Number": pd.array(["TWC-1", None, "TWC-3", ""], dtype="string[pyarrow]"),
+        "Year": pd.Series([2015, 2016, 2025, 2020], dtype="int16"),
+    })
+
+
+@pytest.mark.parametrize("memory_map", [True, False])
+def test_frame_round_trip_keeps_missing_values_and_types(tmp_path, memory_map):
+    path = str(tmp_path / "mixed.feather")
+    snapshot.write_frame(mixed_frame(), path)
+    read = snapshot.read_frame(path, memory_map)
+
+    expected = mixed_frame()
+    if not memory_map:
+        # pandas' own reader gives back Python strings
+        expected["Number"] = expected["Number"].astype("string[python]")
+    pd.testing.assert_frame_equal(read, expected, check_categorical=True)
+
+
+def test_mapped_numbers_and_dates_are_shared_not_copied(tmp_path):
+    path = str(tmp_path / "mixed.feather")
+    snapshot.write_frame(mixed_frame(), path)
+    read = snapshot.read_frame(path, memory_map=True)
+
+    # NaN and NaT are stored as values, so these stay read-only views of the file
+    for column in ("Fine", "Total", "Issued", "Year"):
+        assert not read[column].to_numpy().flags.writeable, column
+    assert read["Number"].dtype == pd.StringDtype("pyarrow")
@@ -0,0 +1,93 @@
+import re
+
+from flask import Flask, request
+
+from dashboard.shared.callbackMetrics import CallbackMetrics
+
+
+def worker(store):
+    # A bare Flask app standing in for one gunicorn worker
+    server = Flask(__name__)
+
+    @server.route("/_dash-update-component", methods=["POST"])
+    def update():
+        body = request.get_json()
+        if isinstance(body, dict) and body["inputs"][0]["value"] == "broken":
+            raise ValueError("boom")
+        return {"response": {}}
+
+    server.config["PROPAGATE_EXCEPTIONS"] = False
+    metrics = CallbackMetrics(
+        server, {"tab-content.children": None}, label_inputs={"tab": ("tabs", ["overview", "trends"])},
+        store=store, flush_interval=3600,
+    )
+    return server.test_client(), metrics
+
+
+def post(client, tab, output="tab-content.children"):
+    return client.post("/_dash-update-component", json={
+        "output": output,
+        "inputs": [{"id": "tabs", "property": "active_tab", "value": tab}],
+    })
+
+
+def counts(text, metric):
+    return {labels: float(value) for labels, value in re.findall(rf"{metric}\{{([^}}]*)\}} (\S+)", text)}
+
+
+def test_metrics_are_summed_across_workers(tmp_path):
+    store = str(tmp_path / "metrics.sqlite3")
+    (first, first_metrics), (second, _) = worker(store), worker(store)
+    for _ in range(3):
+        post(first, "overview")
+    post(second, "overview")
+    post(second, "trends")
+    first_metrics.flush()
+
+    # The second worker's observations reach the file when it answers the scrape
+    text = second.get("/metrics").get_data(as_text=True)
+    totals = counts(text, "dash_callback_duration_seconds_count")
+    assert totals == {
+        'callback="tab-content.children",tab="overview"': 4,
+        'callback="tab-content.children",tab="trends"': 1,
+    }
+    assert counts(first.get("/metrics").get_data(as_text=True), "dash_callback_duration_seconds_count") == totals
+
+
+def test_exceptions_and_buckets(tmp_path):
+    client, _ = worker(str(tmp_path / "metrics.sqlite3"))
+    assert post(client, "broken").status_code == 500
+    post(client, "overview")
+
+    text = client.get("/metrics").get_data(as_text=True)
+    assert counts(text, "dash_callback_exceptions_total") == {
+        'callback="tab-content.children",tab="other",exception="ValueError"': 1,
+    }
+    buckets = counts(text, "dash_callback_response_bytes_bucket")
+    overview = [value for labels, value in buckets.items() if 'tab="overview"' in labels]
+    assert overview == sorted(overview) and overview[-1] == 1
+
+
+def test_unwritable_store_falls_back_to_this_worker(tmp_path):
+    client, _ = worker(str(tmp_path / "missing" / "metrics.sqlite3"))
+    post(client, "overview")
+    text = client.get("/metrics").get_data(as_text=True)
+    assert counts(text, "dash_callback_duration_seconds_count") == {
+        'callback="tab-content.children",tab="overview"': 1,
+    }
+
+
+def test_unknown_label_values_share_one_series(tmp_path):
+    client, _ = worker(str(tmp_path / "metrics.sqlite3"))
+    for output in ["junk-1.children", "junk-2.children", ["a"], {"b": 1}, 7]:
+        assert post(client, "overview", output=output).status_code == 200
+    post(client, ["x"])
+    post(client, "no-such-tab")
+    assert client.post("/_dash-update-component", json=["not", "a", "dict"]).status_code == 200
+
+    text = client.get("/metrics").get_data(as_text=True)
+    assert counts(text, "dash_callback_duration_seconds_count") == {
+        'callback="other",tab="overview"': 5,
+        'callback="tab-content.children",tab="other"': 2,
+        'callback="other",tab="other"': 1,
+    }